@@ -1,11 +1,64 @@
 import streamlit as st
 import sqlite3
+import atexit
+import bisect
+import calendar
+import concurrent.futures
+import contextlib
+import csv
 import datetime
+import difflib
+import functools
+import heapq
+import hmac
+import html
+import inspect
+import io
+import itertools
+import json
+import math
+import os
+import queue
 import re
+import threading
+import time
+import zipfile
+from collections import Counter, OrderedDict, defaultdict
+from contextlib import contextmanager
+
+try:
+    import openpyxl # Optional: only needed for XLSX export/import
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils.exceptions import InvalidFileException
+except ImportError:
+    openpyxl = None
 
 # --- Database Setup and Constants (assuming these are defined elsewhere or add them here) ---
-DB_NAME = "social_service_recommendations.db"
-# Dummy lists for demonstration if not loaded from elsewhere
+DB_NAME = os.environ.get("SOCIAL_SERVICE_DB", "social_service_recommendations.db")
+DB_POOL_SIZE = 4
+DB_BUSY_TIMEOUT_MS = 5000
+DB_LOCK_WAIT_THRESHOLD_SECONDS = 0.001 # An uncontended BEGIN IMMEDIATE is far below this
+DB_STATEMENT_CACHE_SIZE = 128
+READ_CACHE_MAX_ENTRIES = 1024 # Least recently used results are evicted past this
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+RECOMMENDATIONS_PAGE_SIZE = 10
+REASON_PREVIEW_LENGTH = 70
+VISIT_FLUSH_INTERVAL_SECONDS = 10
+VISIT_COUNTER_SHARDS = 8
+WRITER_MAX_BATCH = 64
+WRITER_SUBMIT_TIMEOUT_SECONDS = 30
+EXPORT_CHUNK_SIZE = 500
+SEARCH_PAGE_SIZE = 20
+IMPORT_BATCH_SIZE = 1000
+FIRST_EVENT_NAME = "2025년 1회 사회서비스 투자 교류회" # Round that pre-event-round data is assigned to (migration 5)
+VISIT_COUNT_BASELINE = 19 # Pre-launch test visits, subtracted once by migration 5
+ARCHIVE_DB_NAME = os.environ.get("SOCIAL_SERVICE_ARCHIVE_DB", "social_service_archive.db")
+ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD", "") # Admin menu is hidden when unset
+METRICS_ENABLED = os.environ.get("APP_METRICS", "1") != "0" # APP_METRICS=0 removes all timing wrappers
+METRICS_FILE = os.environ.get("APP_METRICS_FILE", "metrics.prom")
+LATENCY_BUCKETS_SECONDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Seed data for the company_lists table (migration 3). The live lists are
+# maintained from the admin menu; editing these only affects new DB files.
 COMPANIES_2023 = [
     "다나씨엠", "씽즈", "에이치투케이", "이너프유", "자라나다", "휴브리스", "딱따구리", "스쿨버스", "이모티브", "해낸다컴퍼니", "나눔비타민", "도구공간", "윙윙", "로카101", "유알테크", "어뮤즈", "리브라이블리", "메디플렉서스", "복지유니온", "블루레오", "언어발전소", "원더풀플랫폼", "이모코그", "임팩터스", "포페런츠", "픽셀로", "쉘위파트너스", "웰더스스마트케어", "토끼와두꺼비", "안드레이아", "돌봄드림", "라이트하우스", "소리를보는통로", "알밤", "이디피랩", "코액터스", "파라스타엔터테인먼트", "하루하루움직임연구소", "휴카시스템", "기억산책", "세지아", "지아소프트", "마이베네핏", "레드슬리퍼스", "베이띵스", "우리동네히어로", "에스엠플래닛", "엠디스퀘어", "좋은운동장", "케이알지그룹", "핀휠", "홈체크", "그레이스케일", "다이노즈", "효돌"
 ]
@@ -21,10 +74,342 @@ VC_PROVIDED_NAMES = [
     "엔바이오셀","널핏","펴냐니","레몬트리","공도","공감만세","저크","마들렌메모리"
 ]
 
-def init_db():
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("""
+# --- 계측 (latency histograms / counters) ---
+class Metrics:
+    """In-process latency histograms and event counters, exportable as Prometheus text."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_SECONDS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {} # name -> [per-bucket counts (+Inf last), sum, count]
+        self._counters = defaultdict(int)
+
+    def observe(self, name, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def inc(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def _quantile(self, bucket_counts, count, q):
+        # Upper bound of the bucket holding the q-th observation.
+        target = q * count
+        cumulative = 0
+        for upper, bucket_count in zip(self.buckets + (math.inf,), bucket_counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return upper
+        return math.inf
+
+    def summary(self):
+        with self._lock:
+            histograms = {name: ([*h[0]], h[1], h[2]) for name, h in self._histograms.items()}
+            counters = dict(self._counters)
+        rows = []
+        for name, (bucket_counts, total, count) in sorted(histograms.items()):
+            rows.append({
+                "name": name,
+                "count": count,
+                "avg_ms": total / count * 1000,
+                "p50_ms ≤": self._quantile(bucket_counts, count, 0.5) * 1000,
+                "p95_ms ≤": self._quantile(bucket_counts, count, 0.95) * 1000,
+                "p99_ms ≤": self._quantile(bucket_counts, count, 0.99) * 1000,
+                "total_s": total,
+            })
+        return rows, counters
+
+    def prometheus_text(self, gauges=None):
+        with self._lock:
+            histograms = {name: ([*h[0]], h[1], h[2]) for name, h in self._histograms.items()}
+            counters = dict(self._counters)
+        lines = ["# HELP app_latency_seconds Latency of instrumented DB calls and UI sections.", "# TYPE app_latency_seconds histogram"]
+        for name, (bucket_counts, total, count) in sorted(histograms.items()):
+            cumulative = 0
+            for upper, bucket_count in zip(self.buckets + (math.inf,), bucket_counts):
+                cumulative += bucket_count
+                le = "+Inf" if upper == math.inf else repr(upper)
+                lines.append(f'app_latency_seconds_bucket{{op="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'app_latency_seconds_sum{{op="{name}"}} {total!r}')
+            lines.append(f'app_latency_seconds_count{{op="{name}"}} {count}')
+        lines += ["# HELP app_events_total Instrumented event counts.", "# TYPE app_events_total counter"]
+        lines += [f'app_events_total{{event="{name}"}} {value}' for name, value in sorted(counters.items())]
+        if gauges:
+            lines += ["# HELP app_component_stat Point-in-time stats of the pool, caches, writer and counters.", "# TYPE app_component_stat gauge"]
+            for component, stats in gauges.items():
+                lines += [f'app_component_stat{{component="{component}",stat="{stat}"}} {float(value)!r}' for stat, value in stats.items()]
+        return "\n".join(lines) + "\n"
+
+@st.cache_resource(show_spinner=False)
+def get_metrics():
+    return Metrics()
+
+# Resolved once per script run (module re-execution) rather than per observation.
+METRICS = get_metrics() if METRICS_ENABLED else None
+
+class _TimedBlock:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        METRICS.observe(self.name, time.perf_counter() - self.started)
+
+_NO_TIMING = contextlib.nullcontext()
+
+def timed_block(name):
+    return _TimedBlock(name) if METRICS_ENABLED else _NO_TIMING
+
+def timed(name):
+    def decorator(func):
+        if not METRICS_ENABLED:
+            return func # Zero overhead: the function is left unwrapped
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                METRICS.observe(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+def count_event(name, n=1):
+    if METRICS_ENABLED:
+        METRICS.inc(name, n)
+
+# --- DB 커넥션 풀 ---
+class ConnectionPool:
+    """Small per-process pool of sqlite connections shared by all script threads."""
+
+    def __init__(self, db_path, size=DB_POOL_SIZE, busy_timeout_ms=DB_BUSY_TIMEOUT_MS):
+        self.db_path = db_path
+        self.size = size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._idle = queue.LifoQueue() # LIFO keeps the hottest connections (and their statement caches) busy
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._lock_waits = 0
+        self._lock_wait_total = 0.0
+        self._lock_wait_max = 0.0
+
+    @timed("db.connect")
+    def _connect(self):
+        # check_same_thread=False: a connection is only ever used by the thread that
+        # checked it out, but Streamlit runs each rerun on a different thread.
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE_SIZE,
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL") # Durable enough with WAL, and no fsync per commit
+        conn.create_function("fts_bigrams", 1, fts_bigrams, deterministic=True) # Used by the bigram index triggers
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait(), 0.0
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+        if can_open:
+            try:
+                return self._connect(), 0.0
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        started = time.perf_counter()
+        conn = self._idle.get()
+        return conn, time.perf_counter() - started
+
+    @contextmanager
+    def connection(self):
+        conn, waited = self._acquire()
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback() # Never hand a half-finished transaction to the next caller
+            with self._lock:
+                self._in_use -= 1
+            self._idle.put(conn)
+
+    def begin_immediate(self, conn):
+        """Start a write transaction, recording how long busy_timeout waited for the sqlite write lock."""
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        waited = time.perf_counter() - started
+        if METRICS_ENABLED:
+            METRICS.observe("db.lock_wait", waited)
+        if waited >= DB_LOCK_WAIT_THRESHOLD_SECONDS:
+            with self._lock:
+                self._lock_waits += 1
+                self._lock_wait_total += waited
+                self._lock_wait_max = max(self._lock_wait_max, waited)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": self._opened,
+                "in_use": self._in_use,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_total_ms": self._wait_total * 1000,
+                "wait_max_ms": self._wait_max * 1000,
+                "lock_waits": self._lock_waits,
+                "lock_wait_total_ms": self._lock_wait_total * 1000,
+                "lock_wait_max_ms": self._lock_wait_max * 1000,
+            }
+
+@st.cache_resource(show_spinner=False)
+def get_connection_pool(db_path):
+    return ConnectionPool(db_path)
+
+def db_connection():
+    return get_connection_pool(DB_NAME).connection()
+
+def begin_immediate(conn):
+    get_connection_pool(DB_NAME).begin_immediate(conn)
+
+# --- 읽기 캐시 ---
+class ReadCache:
+    """Process-wide cache of query results, dropped whenever the DB file changes.
+
+    Writers in this process call invalidate() right after committing. Commits from
+    anywhere else (other server processes, manual edits) are caught by polling
+    PRAGMA data_version on a dedicated connection before every lookup.
+    """
+
+    def __init__(self, db_path, max_entries=READ_CACHE_MAX_ENTRIES):
+        # data_version is per connection and only moves for *other* connections'
+        # commits, so this one is never used for anything else.
+        self._watch_conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._key_locks = {} # key -> [lock, users]; removed when the last user leaves
+        self._values = OrderedDict()
+        self._data_version = None
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def _check_data_version(self):
+        data_version = self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            if self._data_version is not None:
+                self._drop()
+            self._data_version = data_version
+
+    def _drop(self):
+        self._values.clear()
+        self._generation += 1
+        self.invalidations += 1
+
+    def get(self, key, loader):
+        with self._lock:
+            self._check_data_version()
+            if key in self._values:
+                self.hits += 1
+                self._values.move_to_end(key)
+                return self._values[key]
+            key_lock = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            key_lock[1] += 1
+        # One loader per key at a time: a burst of viewers waits for the first
+        # query instead of each issuing its own.
+        try:
+            with key_lock[0]:
+                with self._lock:
+                    if key in self._values:
+                        self.hits += 1
+                        self._values.move_to_end(key)
+                        return self._values[key]
+                    self.misses += 1
+                    generation = self._generation
+                value = loader()
+                with self._lock:
+                    if generation == self._generation: # Don't store a result that raced a write
+                        self._values[key] = value
+                        if len(self._values) > self.max_entries:
+                            self._values.popitem(last=False)
+                            self.evictions += 1
+                return value
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    del self._key_locks[key]
+
+    def invalidate(self):
+        with self._lock:
+            self._drop()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._values),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+@st.cache_resource(show_spinner=False)
+def get_read_cache(db_path):
+    return ReadCache(db_path)
+
+def read_cached(func):
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Keyed on the bound arguments with defaults filled in, so f(1), f(1, None)
+        # and f(1, after=None) share one entry.
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__,) + bound.args + tuple(bound.kwargs.items())
+        return get_read_cache(DB_NAME).get(key, lambda: func(*bound.args, **bound.kwargs))
+    return wrapper
+
+# --- 스키마 마이그레이션 ---
+# Each migration runs exactly once per DB file, in order; PRAGMA user_version
+# records how many have been applied. Append new steps, never edit old ones.
+def _migration_1_base_tables(conn):
+    # IF NOT EXISTS so DB files created before migrations were tracked adopt cleanly.
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS recommended_companies (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT,
@@ -39,54 +424,955 @@ def init_db():
             raw_searched_name TEXT UNIQUE
         )
     """)
-    cursor.execute("""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS visit_counts (
             id INTEGER PRIMARY KEY CHECK (id = 1),
             count INTEGER DEFAULT 0
         )
     """)
     # Ensure the single row for visit count exists
-    cursor.execute("INSERT OR IGNORE INTO visit_counts (id, count) VALUES (1, 0)")
-    conn.commit()
-    conn.close()
+    conn.execute("INSERT OR IGNORE INTO visit_counts (id, count) VALUES (1, 0)")
 
-def add_recommendation(data):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+def _migration_2_created_at(conn):
+    # Integer epoch copy of the TEXT timestamp (read as UTC, like strftime('%s')),
+    # so ordering no longer depends on string comparison of the TEXT column.
+    conn.execute("ALTER TABLE recommended_companies ADD COLUMN created_at INTEGER")
+    conn.execute("UPDATE recommended_companies SET created_at = CAST(strftime('%s', timestamp) AS INTEGER)")
+    # Writers that predate created_at (older deployments sharing the file) only set timestamp.
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS recommended_companies_fill_created_at
+        AFTER INSERT ON recommended_companies
+        WHEN NEW.created_at IS NULL
+        BEGIN
+            UPDATE recommended_companies SET created_at = CAST(strftime('%s', NEW.timestamp) AS INTEGER) WHERE id = NEW.id;
+        END
+    """)
+    # Narrow index for ORDER BY / COUNT(*), and a covering one for the listing columns.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_recommended_created_at ON recommended_companies (created_at DESC, id DESC)")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_recommended_listing ON recommended_companies
+        (created_at DESC, id DESC, company_name, social_sector, contact_person, recommendation_reason)
+    """)
+
+def _migration_3_company_lists(conn):
+    # Participant lists (one per year) and the VC pool, editable without a redeploy.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS company_lists (
+            id INTEGER PRIMARY KEY,
+            list_name TEXT NOT NULL,
+            company_name TEXT NOT NULL,
+            normalized_name TEXT NOT NULL,
+            UNIQUE (list_name, normalized_name)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_company_lists_normalized ON company_lists (normalized_name)")
+    for list_name, names in ((SOURCE_2023, COMPANIES_2023), (SOURCE_2024, COMPANIES_2024), (SOURCE_VC, VC_PROVIDED_NAMES)):
+        conn.executemany(
+            "INSERT OR IGNORE INTO company_lists (list_name, company_name, normalized_name) VALUES (?, ?, ?)",
+            [(list_name, name, normalize_company_name(name)) for name in names],
+        )
+
+def _create_fulltext_triggers(conn):
+    # Also run by later migrations that rebuild recommended_companies (DROP TABLE drops its triggers).
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS recommended_companies_fts_insert AFTER INSERT ON recommended_companies BEGIN
+            INSERT INTO recommended_companies_fts (rowid, company_name, social_sector, investment_stage, recommendation_reason)
+            VALUES (NEW.id, NEW.company_name, NEW.social_sector, NEW.investment_stage, NEW.recommendation_reason);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS recommended_companies_fts_delete AFTER DELETE ON recommended_companies BEGIN
+            INSERT INTO recommended_companies_fts (recommended_companies_fts, rowid, company_name, social_sector, investment_stage, recommendation_reason)
+            VALUES ('delete', OLD.id, OLD.company_name, OLD.social_sector, OLD.investment_stage, OLD.recommendation_reason);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS recommended_companies_fts_update
+        AFTER UPDATE OF company_name, social_sector, investment_stage, recommendation_reason ON recommended_companies BEGIN
+            INSERT INTO recommended_companies_fts (recommended_companies_fts, rowid, company_name, social_sector, investment_stage, recommendation_reason)
+            VALUES ('delete', OLD.id, OLD.company_name, OLD.social_sector, OLD.investment_stage, OLD.recommendation_reason);
+            INSERT INTO recommended_companies_fts (rowid, company_name, social_sector, investment_stage, recommendation_reason)
+            VALUES (NEW.id, NEW.company_name, NEW.social_sector, NEW.investment_stage, NEW.recommendation_reason);
+        END
+    """)
+
+def _migration_4_fulltext_search(conn):
+    # Filter index for the admin search view (sector/stage facets, newest first).
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_recommended_sector_stage ON recommended_companies
+        (social_sector, investment_stage, created_at DESC, id DESC)
+    """)
+    # External-content FTS5 table: stores only the index, text stays in recommended_companies.
+    # The trigram tokenizer matches inside Korean words ("돌봄서비스" matches "봄서비"),
+    # which a whitespace tokenizer can't. Builds without FTS5/trigram skip it and the
+    # search view falls back to LIKE filters.
     try:
-        cursor.execute("""
-            INSERT INTO recommended_companies 
-            (timestamp, company_name, contact_person, contact_email, contact_phone, social_sector, investment_stage, intro_url, recommendation_reason, raw_searched_name)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (data['timestamp'], data['company_name'], data['contact_person'], data['contact_email'], data['contact_phone'], data['social_sector'], data['investment_stage'], data['intro_url'], data['recommendation_reason'], data['raw_searched_name']))
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS recommended_companies_fts USING fts5(
+                company_name, social_sector, investment_stage, recommendation_reason,
+                content='recommended_companies', content_rowid='id', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError:
+        return
+    _create_fulltext_triggers(conn)
+    conn.execute("INSERT INTO recommended_companies_fts (recommended_companies_fts) VALUES ('rebuild')")
+
+def _migration_5_event_rounds(conn):
+    # Every recommendation and company list now belongs to an event round. SQLite
+    # can't alter a UNIQUE constraint, so both tables are rebuilt with event_id and
+    # the duplicate check becomes per round. Rowids are kept, so the FTS index stays valid.
+    conn.execute("""
+        CREATE TABLE events (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            is_active INTEGER NOT NULL DEFAULT 0,
+            created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+            archived_to TEXT
+        )
+    """)
+    conn.execute("CREATE UNIQUE INDEX idx_events_active ON events (is_active) WHERE is_active = 1") # At most one active round
+    # Summary tables read by the headers and facets instead of COUNT(*) scans. Rows
+    # are maintained by the triggers below; visits are added by BufferedVisitCounter.
+    conn.execute("""
+        CREATE TABLE event_stats (
+            event_id INTEGER PRIMARY KEY REFERENCES events (id),
+            recommendations INTEGER NOT NULL DEFAULT 0,
+            visits INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE event_sector_stage_counts (
+            event_id INTEGER NOT NULL REFERENCES events (id),
+            social_sector TEXT NOT NULL,
+            investment_stage TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (event_id, social_sector, investment_stage)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TRIGGER events_create_stats AFTER INSERT ON events BEGIN
+            INSERT OR IGNORE INTO event_stats (event_id) VALUES (NEW.id);
+        END
+    """)
+    conn.execute("INSERT INTO events (id, name, is_active) VALUES (1, ?, 1)", (FIRST_EVENT_NAME,))
+    # The page used to subtract a baseline of pre-launch test visits on display;
+    # it is folded in here so every round's counter starts from zero.
+    conn.execute(f"UPDATE event_stats SET visits = (SELECT MAX(count - {VISIT_COUNT_BASELINE}, 0) FROM visit_counts WHERE id = 1) WHERE event_id = 1")
+    conn.execute("DROP TABLE visit_counts")
+
+    conn.execute("""
+        CREATE TABLE recommended_companies_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            company_name TEXT,
+            contact_person TEXT,
+            contact_email TEXT,
+            contact_phone TEXT,
+            social_sector TEXT,
+            investment_stage TEXT,
+            intro_url TEXT,
+            recommendation_reason TEXT,
+            raw_searched_name TEXT,
+            created_at INTEGER,
+            event_id INTEGER NOT NULL REFERENCES events (id),
+            UNIQUE (event_id, raw_searched_name)
+        )
+    """)
+    conn.execute("""
+        INSERT INTO recommended_companies_new
+        SELECT id, timestamp, company_name, contact_person, contact_email, contact_phone, social_sector,
+               investment_stage, intro_url, recommendation_reason, raw_searched_name, created_at, 1
+        FROM recommended_companies
+    """)
+    conn.execute("DROP TABLE recommended_companies")
+    conn.execute("ALTER TABLE recommended_companies_new RENAME TO recommended_companies")
+    # Same indexes as before with event_id in front, so every query stays inside one round.
+    conn.execute("""
+        CREATE INDEX idx_recommended_listing ON recommended_companies
+        (event_id, created_at DESC, id DESC, company_name, social_sector, contact_person, recommendation_reason)
+    """)
+    conn.execute("""
+        CREATE INDEX idx_recommended_sector_stage ON recommended_companies
+        (event_id, social_sector, investment_stage, created_at DESC, id DESC)
+    """)
+    conn.execute("""
+        CREATE TRIGGER recommended_companies_fill_created_at
+        AFTER INSERT ON recommended_companies
+        WHEN NEW.created_at IS NULL
+        BEGIN
+            UPDATE recommended_companies SET created_at = CAST(strftime('%s', NEW.timestamp) AS INTEGER) WHERE id = NEW.id;
+        END
+    """)
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'recommended_companies_fts'").fetchone():
+        _create_fulltext_triggers(conn)
+
+    conn.execute("UPDATE event_stats SET recommendations = (SELECT COUNT(*) FROM recommended_companies) WHERE event_id = 1")
+    conn.execute("""
+        INSERT INTO event_sector_stage_counts (event_id, social_sector, investment_stage, count)
+        SELECT event_id, IFNULL(social_sector, ''), IFNULL(investment_stage, ''), COUNT(*)
+        FROM recommended_companies GROUP BY 1, 2, 3
+    """)
+    conn.execute("""
+        CREATE TRIGGER recommended_companies_stats_insert AFTER INSERT ON recommended_companies BEGIN
+            UPDATE event_stats SET recommendations = recommendations + 1 WHERE event_id = NEW.event_id;
+            INSERT INTO event_sector_stage_counts (event_id, social_sector, investment_stage, count)
+            VALUES (NEW.event_id, IFNULL(NEW.social_sector, ''), IFNULL(NEW.investment_stage, ''), 1)
+            ON CONFLICT (event_id, social_sector, investment_stage) DO UPDATE SET count = count + 1;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER recommended_companies_stats_delete AFTER DELETE ON recommended_companies BEGIN
+            UPDATE event_stats SET recommendations = recommendations - 1 WHERE event_id = OLD.event_id;
+            UPDATE event_sector_stage_counts SET count = count - 1
+            WHERE event_id = OLD.event_id AND social_sector = IFNULL(OLD.social_sector, '') AND investment_stage = IFNULL(OLD.investment_stage, '');
+            DELETE FROM event_sector_stage_counts
+            WHERE event_id = OLD.event_id AND social_sector = IFNULL(OLD.social_sector, '') AND investment_stage = IFNULL(OLD.investment_stage, '') AND count <= 0;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER recommended_companies_stats_update
+        AFTER UPDATE OF event_id, social_sector, investment_stage ON recommended_companies BEGIN
+            UPDATE event_stats SET recommendations = recommendations - 1 WHERE event_id = OLD.event_id;
+            UPDATE event_stats SET recommendations = recommendations + 1 WHERE event_id = NEW.event_id;
+            UPDATE event_sector_stage_counts SET count = count - 1
+            WHERE event_id = OLD.event_id AND social_sector = IFNULL(OLD.social_sector, '') AND investment_stage = IFNULL(OLD.investment_stage, '');
+            DELETE FROM event_sector_stage_counts
+            WHERE event_id = OLD.event_id AND social_sector = IFNULL(OLD.social_sector, '') AND investment_stage = IFNULL(OLD.investment_stage, '') AND count <= 0;
+            INSERT INTO event_sector_stage_counts (event_id, social_sector, investment_stage, count)
+            VALUES (NEW.event_id, IFNULL(NEW.social_sector, ''), IFNULL(NEW.investment_stage, ''), 1)
+            ON CONFLICT (event_id, social_sector, investment_stage) DO UPDATE SET count = count + 1;
+        END
+    """)
+
+    conn.execute("""
+        CREATE TABLE company_lists_new (
+            id INTEGER PRIMARY KEY,
+            event_id INTEGER NOT NULL REFERENCES events (id),
+            list_name TEXT NOT NULL,
+            company_name TEXT NOT NULL,
+            normalized_name TEXT NOT NULL,
+            UNIQUE (event_id, list_name, normalized_name)
+        )
+    """)
+    conn.execute("""
+        INSERT INTO company_lists_new (id, event_id, list_name, company_name, normalized_name)
+        SELECT id, 1, list_name, company_name, normalized_name FROM company_lists
+    """)
+    conn.execute("DROP TABLE company_lists")
+    conn.execute("ALTER TABLE company_lists_new RENAME TO company_lists")
+
+def _create_bigram_triggers(conn):
+    # Contentless table, so deletes must resend the old tokens; fts_bigrams is
+    # deterministic, which makes them identical to what was inserted.
+    columns = "company_name, social_sector, investment_stage, recommendation_reason"
+    old_values = "fts_bigrams(OLD.company_name), fts_bigrams(OLD.social_sector), fts_bigrams(OLD.investment_stage), fts_bigrams(OLD.recommendation_reason)"
+    new_values = "fts_bigrams(NEW.company_name), fts_bigrams(NEW.social_sector), fts_bigrams(NEW.investment_stage), fts_bigrams(NEW.recommendation_reason)"
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS recommended_companies_bigram_insert AFTER INSERT ON recommended_companies BEGIN
+            INSERT INTO recommended_companies_bigram (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS recommended_companies_bigram_delete AFTER DELETE ON recommended_companies BEGIN
+            INSERT INTO recommended_companies_bigram (recommended_companies_bigram, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS recommended_companies_bigram_update
+        AFTER UPDATE OF {columns} ON recommended_companies BEGIN
+            INSERT INTO recommended_companies_bigram (recommended_companies_bigram, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+            INSERT INTO recommended_companies_bigram (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    """)
+
+def _migration_6_bigram_search(conn):
+    # Most Korean keywords (돌봄, 복지, 교육) are two characters, below what the
+    # trigram index can answer. This index holds the same columns pre-split into
+    # overlapping character pairs by fts_bigrams(), so such a term is one token.
+    # Connections that write recommended_companies need fts_bigrams registered
+    # (ConnectionPool does this); a bare sqlite3 shell gets "no such function".
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'recommended_companies_fts'").fetchone() is None:
+        return # No FTS5 in this build (see migration 4)
+    conn.execute("""
+        CREATE VIRTUAL TABLE recommended_companies_bigram USING fts5(
+            company_name, social_sector, investment_stage, recommendation_reason,
+            content='', tokenize='unicode61'
+        )
+    """)
+    conn.execute("""
+        INSERT INTO recommended_companies_bigram (rowid, company_name, social_sector, investment_stage, recommendation_reason)
+        SELECT id, fts_bigrams(company_name), fts_bigrams(social_sector), fts_bigrams(investment_stage), fts_bigrams(recommendation_reason)
+        FROM recommended_companies
+    """)
+    _create_bigram_triggers(conn)
+
+def _migration_7_names_version(conn):
+    # Bumped whenever a round's set of known names changes in a way other than a
+    # new recommendation (list imports, deletes, renames), so every process can tell
+    # its in-memory name registry needs a rebuild. New rows are picked up by id.
+    conn.execute("ALTER TABLE event_stats ADD COLUMN names_version INTEGER NOT NULL DEFAULT 0")
+    bump = "UPDATE event_stats SET names_version = names_version + 1 WHERE event_id = {}.event_id;"
+    for name, event, rows in (
+        ("company_lists_names_insert", "AFTER INSERT ON company_lists", bump.format("NEW")),
+        ("company_lists_names_delete", "AFTER DELETE ON company_lists", bump.format("OLD")),
+        ("company_lists_names_update", "AFTER UPDATE ON company_lists", bump.format("OLD") + bump.format("NEW")),
+        ("recommended_companies_names_delete", "AFTER DELETE ON recommended_companies", bump.format("OLD")),
+        ("recommended_companies_names_update", "AFTER UPDATE OF event_id, company_name, raw_searched_name ON recommended_companies", bump.format("OLD") + bump.format("NEW")),
+    ):
+        conn.execute(f"CREATE TRIGGER {name} {event} BEGIN {rows} END")
+
+MIGRATIONS = [
+    _migration_1_base_tables,
+    _migration_2_created_at,
+    _migration_3_company_lists,
+    _migration_4_fulltext_search,
+    _migration_5_event_rounds,
+    _migration_6_bigram_search,
+    _migration_7_names_version,
+]
+
+@timed("db.init_db")
+def init_db():
+    with db_connection() as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= len(MIGRATIONS):
+            return version
+        begin_immediate(conn)
+        # Re-read under the write lock: another process may have migrated meanwhile.
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for migration in MIGRATIONS[version:]:
+            migration(conn)
+        conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
         conn.commit()
-        return True
-    except sqlite3.IntegrityError: # Handles UNIQUE constraint violation for raw_searched_name
+        return len(MIGRATIONS)
+
+@st.cache_resource(show_spinner=False)
+def ensure_schema(db_path):
+    # Streamlit reruns main() on every interaction; migrate once per process and DB file.
+    return init_db()
+
+def timestamp_to_epoch(timestamp):
+    return calendar.timegm(datetime.datetime.strptime(timestamp, TIMESTAMP_FORMAT).timetuple())
+
+def _insert_recommendation(conn, data):
+    conn.execute("""
+        INSERT INTO recommended_companies 
+        (event_id, timestamp, created_at, company_name, contact_person, contact_email, contact_phone, social_sector, investment_stage, intro_url, recommendation_reason, raw_searched_name)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (data['event_id'], data['timestamp'], timestamp_to_epoch(data['timestamp']), data['company_name'], data['contact_person'], data['contact_email'], data['contact_phone'], data['social_sector'], data['investment_stage'], data['intro_url'], data['recommendation_reason'], data['raw_searched_name']))
+
+# --- 추천 저장 전용 writer ---
+class RecommendationWriter:
+    """Single writer thread that group-commits queued recommendation inserts.
+
+    Script threads only enqueue and wait on a Future, so submit bursts don't fight
+    over the sqlite write lock. Everything waiting when the writer wakes up goes
+    into one transaction (up to max_batch rows); each row runs in its own
+    SAVEPOINT so a UNIQUE conflict on (event_id, raw_searched_name) fails only that submitter.
+    """
+
+    def __init__(self, max_batch=WRITER_MAX_BATCH):
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._conflicts = 0
+        self._failed_batches = 0
+        self._max_queue_depth = 0
+        self._commit_total = 0.0
+        self._commit_max = 0.0
+        self._commit_last = 0.0
+        self._thread = threading.Thread(target=self._run, name="recommendation-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, data):
+        future = concurrent.futures.Future()
+        self._queue.put((data, future))
+        with self._lock:
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except Exception as exc:
+                # Last resort: the thread must outlive any bug in one batch, and
+                # nobody may be left waiting on an unresolved future.
+                for data, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _write_batch(self, batch):
+        results = []
+        started = time.perf_counter()
+        try:
+            with db_connection() as conn:
+                begin_immediate(conn)
+                for data, future in batch:
+                    conn.execute("SAVEPOINT recommendation")
+                    try:
+                        _insert_recommendation(conn, data)
+                        results.append((data, future, True))
+                    except sqlite3.IntegrityError: # UNIQUE constraint violation for raw_searched_name
+                        conn.execute("ROLLBACK TO recommendation")
+                        results.append((data, future, False))
+                    except (KeyError, TypeError, ValueError) as exc: # Malformed submission: fail only this row
+                        conn.execute("ROLLBACK TO recommendation")
+                        future.set_exception(exc)
+                    conn.execute("RELEASE recommendation")
+                conn.commit()
+        except Exception as exc:
+            with self._lock:
+                self._failed_batches += 1
+            for data, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        elapsed = time.perf_counter() - started
+        inserted = [data for data, future, ok in results if ok]
+        if METRICS_ENABLED:
+            METRICS.observe("db.writer_commit", elapsed)
+            count_event("recommendations.inserted", len(inserted))
+            count_event("recommendations.duplicates", len(results) - len(inserted))
+        with self._lock:
+            self._batches += 1
+            self._rows += len(inserted)
+            self._conflicts += len(results) - len(inserted)
+            self._commit_total += elapsed
+            self._commit_max = max(self._commit_max, elapsed)
+            self._commit_last = elapsed
+        try:
+            if inserted:
+                get_read_cache(DB_NAME).invalidate()
+                for data in inserted:
+                    get_name_registry(data['event_id']).add(data['raw_searched_name'], SOURCE_RECOMMENDED, data['company_name'])
+        except Exception:
+            # The rows are committed either way; drop the registries so the next
+            # search rebuilds them from the DB instead of missing these names.
+            count_event("writer.post_commit_errors")
+            get_name_registry.clear()
+        finally:
+            for data, future, ok in results:
+                future.set_result(ok)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": self._batches,
+                "rows": self._rows,
+                "conflicts": self._conflicts,
+                "failed_batches": self._failed_batches,
+                "avg_batch_size": (self._rows + self._conflicts) / self._batches if self._batches else 0.0,
+                "commit_avg_ms": self._commit_total / self._batches * 1000 if self._batches else 0.0,
+                "commit_max_ms": self._commit_max * 1000,
+                "commit_last_ms": self._commit_last * 1000,
+            }
+
+@st.cache_resource(show_spinner=False)
+def get_recommendation_writer(db_path):
+    return RecommendationWriter()
+
+@timed("db.add_recommendation")
+def add_recommendation(data):
+    """Queue an insert on the writer thread; True if stored, False on a duplicate or failure."""
+    future = get_recommendation_writer(DB_NAME).submit(data)
+    try:
+        return future.result(timeout=WRITER_SUBMIT_TIMEOUT_SECONDS)
+    except Exception: # DB errors, timeouts and malformed data all show the same retry message
+        count_event("recommendations.failed")
         return False
-    finally:
-        conn.close()
 
-def get_all_recommendations():
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM recommended_companies ORDER BY timestamp DESC")
-    recs = cursor.fetchall()
-    conn.close()
-    return recs
+@timed("db.get_all_recommendations")
+@read_cached
+def get_all_recommendations(event_id):
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM recommended_companies WHERE event_id = ? ORDER BY created_at DESC, id DESC", (event_id,))
+        return cursor.fetchall()
+
+@timed("db.get_recommendations_page")
+@read_cached
+def get_recommendations_page(event_id, after=None, limit=RECOMMENDATIONS_PAGE_SIZE):
+    """One page of a round's list view, newest first.
+
+    ``after`` is the (created_at, id) cursor returned with the previous page; the
+    returned cursor is None on the last page. Only displayed columns are read and
+    the reason is cut to a preview, so both queries are served from
+    idx_recommended_listing without touching the table rows.
+    """
+    with db_connection() as conn:
+        if after is None:
+            rows = conn.execute("""
+                SELECT id, created_at, company_name, social_sector, contact_person, substr(recommendation_reason, 1, ?)
+                FROM recommended_companies
+                WHERE event_id = ?
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+            """, (REASON_PREVIEW_LENGTH + 1, event_id, limit + 1)).fetchall()
+        else:
+            rows = conn.execute("""
+                SELECT id, created_at, company_name, social_sector, contact_person, substr(recommendation_reason, 1, ?)
+                FROM recommended_companies
+                WHERE event_id = ? AND (created_at, id) < (?, ?)
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+            """, (REASON_PREVIEW_LENGTH + 1, event_id, after[0], after[1], limit + 1)).fetchall()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][1], rows[-1][0])
+
+@timed("db.count_recommendations")
+@read_cached
+def count_recommendations(event_id):
+    # Trigger-maintained, so this is one row regardless of how many were submitted.
+    with db_connection() as conn:
+        result = conn.execute("SELECT recommendations FROM event_stats WHERE event_id = ?", (event_id,)).fetchone()
+    return result[0] if result else 0
+
+@timed("db.get_company_list")
+@read_cached
+def get_company_list(event_id, list_name):
+    with db_connection() as conn:
+        return [row[0] for row in conn.execute("SELECT company_name FROM company_lists WHERE event_id = ? AND list_name = ? ORDER BY id", (event_id, list_name))]
+
+@read_cached
+def get_company_list_names(event_id):
+    with db_connection() as conn:
+        return [row[0] for row in conn.execute("SELECT DISTINCT list_name FROM company_lists WHERE event_id = ? ORDER BY list_name", (event_id,))]
+
+# --- 교류회 회차 ---
+# One round is active at a time: new recommendations, visits and the duplicate
+# check all belong to it. Finished rounds can be moved to ARCHIVE_DB_NAME.
+ARCHIVED_TABLES = { # Table -> key columns, so re-running an interrupted archive copies nothing twice
+    "events": "id",
+    "event_stats": "event_id",
+    "event_sector_stage_counts": "event_id, social_sector, investment_stage",
+    "recommended_companies": "id",
+    "company_lists": "id",
+}
+
+@read_cached
+def get_active_event():
+    """(id, name) of the round currently taking recommendations."""
+    with db_connection() as conn:
+        return conn.execute("SELECT id, name FROM events WHERE is_active = 1").fetchone()
+
+def active_event_id():
+    return get_active_event()[0]
+
+@read_cached
+def list_events():
+    """(id, name, is_active, recommendations, visits, archived_to) for every round, newest first."""
+    with db_connection() as conn:
+        return conn.execute("""
+            SELECT e.id, e.name, e.is_active, s.recommendations, s.visits, e.archived_to
+            FROM events e LEFT JOIN event_stats s ON s.event_id = e.id
+            ORDER BY e.id DESC
+        """).fetchall()
+
+def start_event(name):
+    """Open a new active round, starting from a copy of the current round's company lists."""
+    get_visit_counter(DB_NAME).flush() # Visits buffered so far belong to the round that is ending
+    with db_connection() as conn:
+        begin_immediate(conn)
+        previous = conn.execute("SELECT id FROM events WHERE is_active = 1").fetchone()
+        conn.execute("UPDATE events SET is_active = 0 WHERE is_active = 1")
+        event_id = conn.execute("INSERT INTO events (name, is_active) VALUES (?, 1)", (name,)).lastrowid
+        if previous:
+            conn.execute("""
+                INSERT INTO company_lists (event_id, list_name, company_name, normalized_name)
+                SELECT ?, list_name, company_name, normalized_name FROM company_lists WHERE event_id = ? ORDER BY id
+            """, (event_id, previous[0]))
+        conn.commit()
+    get_read_cache(DB_NAME).invalidate()
+    get_name_registry.clear()
+    return event_id
+
+def archive_event(event_id, archive_path=ARCHIVE_DB_NAME):
+    """Move a finished round's rows into the archive DB file; returns how many recommendations moved.
+
+    Copy and delete are separate transactions because a commit spanning an attached
+    file is not atomic in WAL mode. A crash in between leaves the rows in both
+    files, and running this again finishes the job. Freed pages are reused by later
+    rounds, so the main file stops growing without a VACUUM.
+    """
+    with db_connection() as conn:
+        event = conn.execute("SELECT is_active, archived_to FROM events WHERE id = ?", (event_id,)).fetchone()
+        if event is None:
+            raise ValueError(f"Unknown event: {event_id}")
+        if event[0]:
+            raise ValueError("진행 중인 회차는 보관할 수 없습니다.")
+        conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+        try:
+            begin_immediate(conn)
+            for table, key in ARCHIVED_TABLES.items():
+                conn.execute(f"CREATE TABLE IF NOT EXISTS archive.{table} AS SELECT * FROM main.{table} WHERE 0")
+                conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS archive.{table}_key ON {table} ({key})")
+                conn.execute(f"INSERT OR IGNORE INTO archive.{table} SELECT * FROM main.{table} WHERE {'id' if table == 'events' else 'event_id'} = ?", (event_id,))
+            conn.commit()
+            begin_immediate(conn)
+            moved = conn.execute("DELETE FROM main.recommended_companies WHERE event_id = ?", (event_id,)).rowcount
+            conn.execute("DELETE FROM main.company_lists WHERE event_id = ?", (event_id,))
+            conn.execute("DELETE FROM main.event_sector_stage_counts WHERE event_id = ?", (event_id,))
+            conn.execute("DELETE FROM main.event_stats WHERE event_id = ?", (event_id,))
+            conn.execute("UPDATE main.events SET archived_to = ? WHERE id = ?", (archive_path, event_id))
+            conn.commit()
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute("DETACH DATABASE archive")
+    get_read_cache(DB_NAME).invalidate()
+    return moved
+
+# --- 추천 사유 전문 검색 (FTS5) ---
+FTS_MIN_TERM_LENGTH = 3 # Trigram index can only answer terms of three or more characters
+BIGRAM_TERM_LENGTH = 2 # Two-character terms ("돌봄", "AI") go to the bigram index
+SNIPPET_START, SNIPPET_END = "\x02", "\x03" # Highlight markers, swapped for <mark> after escaping
+FTS_TABLE = "recommended_companies_fts"
+BIGRAM_TABLE = "recommended_companies_bigram"
+_WORD_RUN = re.compile(r"[^\W_]+")
+
+def fts_bigrams(text):
+    """Overlapping character pairs per word: "돌봄서비스 AI" -> "돌봄 봄서 서비 비스 AI".
+
+    Registered as an SQL function on every pool connection; the bigram index
+    triggers call it, so it must stay deterministic.
+    """
+    if not text:
+        return ""
+    return " ".join(run[i:i + 2] for run in _WORD_RUN.findall(text) for i in range(max(len(run) - 1, 1)))
+
+@st.cache_resource(show_spinner=False)
+def has_fulltext_index(db_path, table=FTS_TABLE):
+    with db_connection() as conn:
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (table,)).fetchone() is not None
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+def _like_pattern(term):
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def _recommendation_search_filter(event_id, query):
+    """FROM/WHERE for one round and the query terms: (sql, params, rank_table). All terms must match.
+
+    rank_table is the FTS table whose bm25 rank orders the results, or None.
+    """
+    terms = query.split()
+    trigram_terms = [t for t in terms if len(t) >= FTS_MIN_TERM_LENGTH and has_fulltext_index(DB_NAME)]
+    bigram_terms = [t for t in terms if len(t) == BIGRAM_TERM_LENGTH and _WORD_RUN.fullmatch(t) and has_fulltext_index(DB_NAME, BIGRAM_TABLE)]
+    scanned = [t for t in terms if t not in trigram_terms and t not in bigram_terms]
+    rank_table = FTS_TABLE if trigram_terms else BIGRAM_TABLE if bigram_terms else None
+    params = []
+    if rank_table:
+        # CROSS JOIN pins the FTS match as the outer loop; otherwise the planner may
+        # walk a sector/stage index and re-run MATCH for every row it finds.
+        sql = f"""
+            FROM {rank_table} CROSS JOIN recommended_companies r ON r.id = {rank_table}.rowid
+            WHERE {rank_table} MATCH ? AND rank MATCH 'bm25(10.0, 2.0, 2.0, 1.0)' AND r.event_id = ?
+        """ # Column weights: company-name hits rank above reason hits
+        params += [" AND ".join(map(_fts_phrase, trigram_terms or bigram_terms)), event_id]
+        if trigram_terms and bigram_terms:
+            sql += f" AND r.id IN (SELECT rowid FROM {BIGRAM_TABLE} WHERE {BIGRAM_TABLE} MATCH ?)"
+            params.append(" AND ".join(map(_fts_phrase, bigram_terms)))
+    else:
+        sql = "FROM recommended_companies r WHERE r.event_id = ?"
+        params.append(event_id)
+    # What's left (single characters, or everything on builds without FTS5) is checked
+    # row by row, but only on the rows the indexed terms already narrowed down to.
+    for term in scanned:
+        sql += " AND (r.company_name LIKE ? ESCAPE '\\' OR r.recommendation_reason LIKE ? ESCAPE '\\' OR r.social_sector LIKE ? ESCAPE '\\')"
+        params += [_like_pattern(term)] * 3
+    return sql, params, rank_table
 
+def _term_snippet(text, terms, width=REASON_PREVIEW_LENGTH * 2):
+    """Window of ``text`` around the first term hit, with hits wrapped in snippet markers.
+
+    The bigram index is contentless, so FTS5's snippet() can't be used for it.
+    """
+    text = text or ""
+    pattern = re.compile("|".join(map(re.escape, sorted(terms, key=len, reverse=True))), re.IGNORECASE) if terms else None
+    match = pattern.search(text) if pattern else None
+    start = max(match.start() - width // 4, 0) if match else 0
+    window = text[start:start + width]
+    if pattern:
+        window = pattern.sub(lambda m: SNIPPET_START + m.group(0) + SNIPPET_END, window)
+    return ("…" if start else "") + window + ("…" if start + width < len(text) else "")
+
+@timed("db.search_facet_pairs")
+@read_cached
+def search_facet_pairs(event_id, query=""):
+    """(social_sector, investment_stage, count) for every pair among a round's matches.
+
+    Depends only on the query, so paging and facet clicks reuse one cached result
+    instead of regrouping every match on each rerun.
+    """
+    if not query.split(): # Without a query the trigger-maintained counts hold the same numbers
+        with db_connection() as conn:
+            return conn.execute("SELECT social_sector, investment_stage, count FROM event_sector_stage_counts WHERE event_id = ?", (event_id,)).fetchall()
+    sql, params, _ = _recommendation_search_filter(event_id, query)
+    with db_connection() as conn:
+        return conn.execute(f"SELECT r.social_sector, r.investment_stage, COUNT(*) {sql} GROUP BY 1, 2", params).fetchall()
+
+@timed("db.search_recommendations")
+@read_cached
+def search_recommendations(event_id, query="", sector=None, stage=None, page=0, page_size=SEARCH_PAGE_SIZE):
+    """A round's BM25-ranked matches (newest first without indexed terms) plus facet counts.
+
+    Returns (rows, total, sector_counts, stage_counts); rows are
+    (id, created_at, company_name, social_sector, investment_stage, contact_person, snippet).
+    Each facet is counted with the other facet's filter applied, not its own.
+    """
+    sql, params, rank_table = _recommendation_search_filter(event_id, query)
+    filtered_sql, filtered_params = sql, list(params)
+    if sector is not None:
+        filtered_sql += " AND r.social_sector = ?"
+        filtered_params.append(sector)
+    if stage is not None:
+        filtered_sql += " AND r.investment_stage = ?"
+        filtered_params.append(stage)
+    if rank_table == FTS_TABLE:
+        snippet = f"snippet({FTS_TABLE}, 3, '{SNIPPET_START}', '{SNIPPET_END}', '…', 16)"
+    else:
+        snippet = "r.recommendation_reason" # Cut down by _term_snippet for the page's rows only
+    order = "rank, r.id DESC" if rank_table else "r.created_at DESC, r.id DESC"
+    with db_connection() as conn:
+        rows = conn.execute(
+            f"SELECT r.id, r.created_at, r.company_name, r.social_sector, r.investment_stage, r.contact_person, {snippet} {filtered_sql} ORDER BY {order} LIMIT ? OFFSET ?",
+            filtered_params + [page_size, page * page_size],
+        ).fetchall()
+    if rank_table != FTS_TABLE:
+        rows = [row[:-1] + (_term_snippet(row[-1], query.split()),) for row in rows]
+    # Both facets and the total fold out of the query's grouped pairs.
+    sector_counts = Counter()
+    stage_counts = Counter()
+    total = 0
+    for pair_sector, pair_stage, n in search_facet_pairs(event_id, query):
+        if stage is None or pair_stage == stage:
+            sector_counts[pair_sector] += n
+        if sector is None or pair_sector == sector:
+            stage_counts[pair_stage] += n
+            if stage is None or pair_stage == stage:
+                total += n
+    return rows, total, sector_counts.most_common(), stage_counts.most_common()
+
+def highlight_snippet(snippet):
+    return html.escape(snippet or "").replace(SNIPPET_START, "<mark>").replace(SNIPPET_END, "</mark>")
+
+# --- 데이터 내보내기 / 가져오기 ---
+EXPORT_COLUMNS = ["id", "timestamp", "company_name", "contact_person", "contact_email", "contact_phone", "social_sector", "investment_stage", "intro_url", "recommendation_reason", "raw_searched_name", "event_id"]
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/jsonl",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+COMPANY_LIST_HEADERS = {"company_name", "기업명", "name"}
+SPREADSHEET_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# What a malformed upload can raise while being read, shown as a failed import.
+IMPORT_FILE_ERRORS = (RuntimeError, ValueError, KeyError, UnicodeDecodeError, csv.Error, zipfile.BadZipFile, sqlite3.Error) + ((InvalidFileException,) if openpyxl else ())
+
+def _is_formula_like(value):
+    # Public form input: Excel/Sheets would run such a cell as a formula.
+    return isinstance(value, str) and value.startswith(SPREADSHEET_FORMULA_PREFIXES)
+
+def _csv_safe(value):
+    return "'" + value if _is_formula_like(value) else value
+
+def _xlsx_cell(sheet, value):
+    if not _is_formula_like(value):
+        return value
+    cell = WriteOnlyCell(sheet, value=value)
+    cell.data_type = "s" # openpyxl would otherwise store "=..." as a live formula
+    return cell
+
+def iter_recommendation_chunks(event_id, chunk_size=EXPORT_CHUNK_SIZE):
+    # Keyset chunks by id: each chunk is its own short query, so an export never
+    # pins a connection or holds a read transaction open while the file is written.
+    last_id = 0
+    while True:
+        with db_connection() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(EXPORT_COLUMNS)} FROM recommended_companies WHERE event_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (event_id, last_id, chunk_size),
+            ).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+def export_recommendations(event_id, fmt, out):
+    """Write a round's recommendations to the binary file object ``out`` as csv, jsonl or xlsx."""
+    if fmt == "xlsx":
+        if openpyxl is None:
+            raise RuntimeError("XLSX 내보내기에는 openpyxl 패키지가 필요합니다.")
+        workbook = openpyxl.Workbook(write_only=True) # Streams rows to disk instead of building a sheet in memory
+        sheet = workbook.create_sheet("recommended_companies")
+        sheet.append(EXPORT_COLUMNS)
+        for rows in iter_recommendation_chunks(event_id):
+            for row in rows:
+                sheet.append([_xlsx_cell(sheet, value) for value in row])
+        workbook.save(out)
+        return
+    text_out = io.TextIOWrapper(out, encoding="utf-8-sig" if fmt == "csv" else "utf-8", newline="", write_through=True)
+    if fmt == "csv":
+        writer = csv.writer(text_out)
+        writer.writerow(EXPORT_COLUMNS)
+        for rows in iter_recommendation_chunks(event_id):
+            writer.writerows([_csv_safe(value) for value in row] for row in rows)
+    elif fmt == "jsonl":
+        for rows in iter_recommendation_chunks(event_id):
+            text_out.writelines(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n" for row in rows)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    text_out.detach() # Leave ``out`` open for the caller
+
+def export_recommendations_file(event_id, fmt):
+    # download_button only accepts bytes/str/BytesIO-like payloads and holds the
+    # whole file in memory anyway, so there is nothing to gain from spooling to disk.
+    out = io.BytesIO()
+    export_recommendations(event_id, fmt, out)
+    return out.getvalue()
+
+def iter_company_names(file_name, data):
+    """Company names from an uploaded list: first column of csv/txt/xlsx, or jsonl records."""
+    lowered = file_name.lower()
+    if lowered.endswith(".xlsx"):
+        if openpyxl is None:
+            raise RuntimeError("XLSX 가져오기에는 openpyxl 패키지가 필요합니다.")
+        workbook = openpyxl.load_workbook(data, read_only=True)
+        values = (row[0] if row else None for row in workbook.active.iter_rows(values_only=True))
+    elif lowered.endswith(".jsonl"):
+        lines = (line for line in io.TextIOWrapper(data, encoding="utf-8-sig") if line.strip())
+        values = (record.get("company_name") if isinstance(record, dict) else record for record in map(json.loads, lines))
+    else:
+        values = (row[0] if row else None for row in csv.reader(io.TextIOWrapper(data, encoding="utf-8-sig", newline="")))
+    for value in values:
+        name = str(value).strip() if value is not None else ""
+        if name and name.lower() not in COMPANY_LIST_HEADERS:
+            yield name
+
+def import_company_list(event_id, list_name, names, replace=True):
+    """Load a round's participant (year) or VC-pool list; returns how many distinct names it holds."""
+    rows = {}
+    for name in names:
+        rows.setdefault(normalize_company_name(name), name) # First spelling wins for duplicates
+    rows.pop("", None)
+    with db_connection() as conn:
+        begin_immediate(conn)
+        if replace:
+            conn.execute("DELETE FROM company_lists WHERE event_id = ? AND list_name = ?", (event_id, list_name))
+        pending = ((event_id, list_name, name, normalized_name) for normalized_name, name in rows.items())
+        while True:
+            batch = list(itertools.islice(pending, IMPORT_BATCH_SIZE))
+            if not batch:
+                break
+            conn.executemany("INSERT OR IGNORE INTO company_lists (event_id, list_name, company_name, normalized_name) VALUES (?, ?, ?, ?)", batch)
+        conn.commit()
+    get_read_cache(DB_NAME).invalidate()
+    get_name_registry.clear() # Names may have been removed; rebuilt on the next search
+    return len(rows)
+
+# --- 방문자 수 버퍼 ---
+class BufferedVisitCounter:
+    """Accumulates visits in memory and adds them to the active round's event_stats in batches.
+
+    Script threads add to one of several lock-protected shards (assigned round-robin
+    on a thread's first visit) so they rarely contend; a background thread folds the shards into a single
+    UPDATE every flush_interval seconds and once more at interpreter exit.
+    """
+
+    def __init__(self, flush_interval=VISIT_FLUSH_INTERVAL_SECONDS, shards=VISIT_COUNTER_SHARDS):
+        self.flush_interval = flush_interval
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._counts = [0] * shards
+        self._next_shard = itertools.count()
+        self._thread_shard = threading.local()
+        self._flush_lock = threading.Lock()
+        self._in_flight = 0 # Drained from the shards but not committed yet
+        self._stop = threading.Event()
+        self.flushes = 0
+        self._thread = threading.Thread(target=self._run, name="visit-counter-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def increment(self, n=1):
+        # Not threading.get_ident() % shards: idents are page-aligned stack
+        # addresses, so that puts every thread on shard 0.
+        shard = getattr(self._thread_shard, "index", None)
+        if shard is None:
+            shard = self._thread_shard.index = next(self._next_shard) % len(self._counts) # count() is atomic under the GIL
+        with self._locks[shard]:
+            self._counts[shard] += n
+
+    def pending(self):
+        total = self._in_flight
+        for shard, lock in enumerate(self._locks):
+            with lock:
+                total += self._counts[shard]
+        return total
+
+    def flush(self):
+        with self._flush_lock:
+            delta = 0
+            for shard, lock in enumerate(self._locks):
+                with lock:
+                    delta += self._counts[shard]
+                    self._counts[shard] = 0
+            if not delta:
+                return 0
+            self._in_flight = delta
+            try:
+                with db_connection() as conn:
+                    begin_immediate(conn)
+                    conn.execute("UPDATE event_stats SET visits = visits + ? WHERE event_id = (SELECT id FROM events WHERE is_active = 1)", (delta,))
+                    conn.commit()
+            except Exception:
+                self.increment(delta) # Keep the visits for the next attempt
+                raise
+            finally:
+                self._in_flight = 0
+            self.flushes += 1
+        count_event("visits.flushed", delta)
+        get_read_cache(DB_NAME).invalidate()
+        return delta
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass # Retried on the next tick; the counts stay buffered
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+@st.cache_resource(show_spinner=False)
+def get_visit_counter(db_path):
+    return BufferedVisitCounter()
+
+@timed("db.increment_visit_count")
 def increment_visit_count():
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("UPDATE visit_counts SET count = count + 1 WHERE id = 1")
-    conn.commit()
-    conn.close()
-
-def get_visit_count():
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT count FROM visit_counts WHERE id = 1")
-    result = cursor.fetchone()
-    conn.close()
+    # No write per visitor: the counter flushes the accumulated delta in the background.
+    get_visit_counter(DB_NAME).increment()
+
+@timed("db.get_visit_count")
+@read_cached
+def get_visit_count(event_id):
+    with db_connection() as conn:
+        result = conn.execute("SELECT visits FROM event_stats WHERE event_id = ?", (event_id,)).fetchone()
     return result[0] if result else 0
 
 def normalize_company_name(name):
@@ -96,87 +1382,283 @@ def normalize_company_name(name):
     name = re.sub(r'\s+', '', name) # Remove all whitespace
     return name
 
-# --- Streamlit UI 구성 ---
-def main():
-    st.set_page_config(page_title="사회서비스 투자교류회 기업업 추천", page_icon="🌱", layout="wide")
+# --- 기업명 레지스트리 (검색용) ---
+# A source is a company_lists.list_name (a participant year such as "2023", or
+# "vc") or "recommended". A name in several sources is reported under the first
+# one registered: older participant years, then the VC pool, then recommendations.
+SOURCE_2023 = "2023"
+SOURCE_2024 = "2024"
+SOURCE_VC = "vc"
+SOURCE_RECOMMENDED = "recommended"
+SOURCE_LABELS = {
+    SOURCE_VC: "운영진 Pooling",
+    SOURCE_RECOMMENDED: "추천 목록",
+}
 
-    # Custom CSS
-    st.markdown("""
-        <style>
-            .stApp {
-                background-color: #FFFFFF; /* Changed to white */
-            }
-            .main .block-container {
-                padding-top: 2rem;
-                padding-bottom: 2rem;
-                padding-left: 3rem;
-                padding-right: 3rem;
-            }
-            .stButton>button {
-                border-radius: 8px;
-            }
-            /* Input fields styling for better visibility and focus effect */
-            .stTextInput input, .stTextArea textarea, .stSelectbox select {
-                border-radius: 8px;
-                border: 1px solid #cccccc; /* Default border for distinction */
-                padding: 0.5em 0.75em; /* Added padding for better text appearance */
-                background-color: #FFFFFF; /* Ensure input background is white */
-                transition: border-color 0.2s ease-in-out, box-shadow 0.2s ease-in-out; /* Smooth transition */
-            }
-            .stTextInput input:focus, .stTextArea textarea:focus, .stSelectbox select:focus {
-                border-color: #4A90E2; /* Blue border on focus */
-                box-shadow: 0 0 0 0.2rem rgba(74, 144, 226, 0.25); /* Subtle blue glow on focus */
-                outline: none; /* Remove default browser outline if custom styling is applied */
-            }
-            h1 {
-                font-size: 2.2em; font-weight: 600; color: #1A202C;
-            }
-            h2 { /* 섹션 제목 - st.header 사용 */
-                font-size: 1.6em; font-weight: 600; color: #2D3748;
-                border-bottom: 2px solid #E2E8F0; padding-bottom: 0.3em;
-                margin-top: 2em; margin-bottom: 1em;
-            }
-            .stAlert { border-radius: 8px; }
-            .list-item {
-                padding: 0.5rem 0;
-                border-bottom: 1px solid #e9ecef;
-            }
-            .list-item:last-child { border-bottom: none; }
-            .company-name { font-weight: 600; color: #333; }
-            .company-detail { font-size: 0.9em; color: #555; }
-            .vc-list-item { /* VC 제공 리스트 아이템 전용 스타일 */
-                padding: 0.4rem 0.8rem;
-                margin-bottom: 0.3rem;
-                background-color: #F8F9FA; /* Slightly off-white for VC items if needed, or #FFFFFF */
-                border-left: 3px solid #4A90E2; /* 파란색 강조선 */
-                border-radius: 4px;
-            }
-            .info-block { /* 긴 안내문구를 위한 스타일 */
-                padding: 1.5rem;
-                background-color: #F8F9FA; /* Kept slightly off-white for this block, or change to #FFFFFF */
-                border: 1px solid #E2E8F0; /* Add a subtle border if background is also white */
-                border-radius: 8px;
-                line-height: 1.7;
-                font-size: 0.95em;
-            }
-            .info-block strong {
-                color: #0072C6;
-            }
-        </style>
-    """, unsafe_allow_html=True)
+def is_participant_list(source):
+    return bool(source) and source.isdigit()
 
-    init_db() # DB 초기화
+def source_label(source):
+    return f"{source}년 참여 기업" if is_participant_list(source) else SOURCE_LABELS.get(source, source)
 
-    # 방문자 수 트래킹
-    if 'visited_this_session' not in st.session_state:
-        increment_visit_count()
-        st.session_state.visited_this_session = True
-    current_visit_count = get_visit_count()
+class CompanyNameRegistry:
+    """Maps normalized company name -> (source, original display name)."""
 
-    # --- 페이지 제목 ---
-    st.title("🌱 사회서비스 투자기업 추천")
+    def __init__(self, names_version=None):
+        self._names = {}
+        self._fuzzy = FuzzyNameIndex()
+        self._lock = threading.Lock()
+        self.names_version = names_version # event_stats.names_version this was built from
+        self.last_recommendation_id = 0
+
+    def add_recommendations(self, rows):
+        """Catch up on (id, raw_searched_name, company_name) rows committed since the build."""
+        for rec_id, normalized_name, display_name in rows:
+            self.add(normalized_name, SOURCE_RECOMMENDED, display_name)
+            with self._lock:
+                self.last_recommendation_id = max(self.last_recommendation_id, rec_id)
+
+    def add(self, normalized_name, source, display_name):
+        if not normalized_name:
+            return False
+        with self._lock:
+            if normalized_name in self._names:
+                return False
+            self._names[normalized_name] = (source, display_name)
+            self._fuzzy.add(normalized_name, display_name)
+            return True
+
+    def lookup(self, normalized_name):
+        return self._names.get(normalized_name)
+
+    def similar(self, name, k=5, min_score=0.5):
+        """Near-duplicate candidates for ``name`` as (score, source, display name)."""
+        normalized_name = normalize_company_name(name)
+        results = []
+        for score, candidate in self._fuzzy.search(name, k=k + 1, min_score=min_score):
+            if candidate == normalized_name:
+                continue
+            source, display_name = self._names[candidate]
+            results.append((score, source, display_name))
+        return results[:k]
+
+    def __len__(self):
+        return len(self._names)
+
+# --- 유사 기업명 검색 (자모 n-gram 인덱스) ---
+# Hangul syllables are decomposed into basic jamo (compound vowels/finals split
+# too) so that one-letter typos only disturb a few n-grams. Latin letters and
+# digits are spelled out the way they are read in Korean, so "H2K" and
+# "에이치투케이" end up with the same key.
+_CHOSEONG = ["ㄱ", "ㄱㄱ", "ㄴ", "ㄷ", "ㄷㄷ", "ㄹ", "ㅁ", "ㅂ", "ㅂㅂ", "ㅅ", "ㅅㅅ", "ㅇ", "ㅈ", "ㅈㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+_JUNGSEONG = ["ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ", "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ"]
+_JONGSEONG = ["", "ㄱ", "ㄱㄱ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ", "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅅㅅ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+_LATIN_READINGS = {
+    "a": "에이", "b": "비", "c": "씨", "d": "디", "e": "이", "f": "에프", "g": "지", "h": "에이치", "i": "아이",
+    "j": "제이", "k": "케이", "l": "엘", "m": "엠", "n": "엔", "o": "오", "p": "피", "q": "큐", "r": "알",
+    "s": "에스", "t": "티", "u": "유", "v": "브이", "w": "더블유", "x": "엑스", "y": "와이", "z": "지",
+    "0": "제로", "1": "원", "2": "투", "3": "쓰리", "4": "포", "5": "파이브", "6": "식스", "7": "세븐", "8": "에이트", "9": "나인",
+}
+
+def decompose_hangul(text):
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHOSEONG[code // 588] + _JUNGSEONG[(code % 588) // 28] + _JONGSEONG[code % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+def fuzzy_name_key(name):
+    spelled = "".join(_LATIN_READINGS.get(ch, ch) for ch in normalize_company_name(name))
+    spelled = re.sub(r'[^\w]', '', spelled) # Drop punctuation such as "&", "-", "."
+    return decompose_hangul(spelled)
+
+class FuzzyNameIndex:
+    """Character n-gram inverted index over jamo keys, ranked by Dice similarity."""
+
+    def __init__(self, n=3):
+        self.n = n
+        self._names = []       # entry id -> normalized name
+        self._sizes = []       # entry id -> number of distinct n-grams
+        self._jamo = []        # entry id -> jamo key, used for the final re-rank
+        self._postings = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def _ngrams(self, key):
+        padded = f"#{key}#"
+        if len(padded) <= self.n:
+            return frozenset([padded])
+        return frozenset(padded[i:i + self.n] for i in range(len(padded) - self.n + 1))
+
+    def add(self, normalized_name, display_name=None):
+        key = fuzzy_name_key(display_name or normalized_name)
+        if not key:
+            return
+        grams = self._ngrams(key)
+        with self._lock:
+            entry_id = len(self._names)
+            self._names.append(normalized_name)
+            self._sizes.append(len(grams))
+            self._jamo.append(key)
+            for gram in grams:
+                self._postings[gram].append(entry_id)
+
+    def search(self, name, k=5, min_score=0.5):
+        # Readers don't take the lock: entries are append-only, so a concurrent
+        # add can at worst make a brand new name invisible to this search.
+        key = fuzzy_name_key(name)
+        if not key:
+            return []
+        query_grams = self._ngrams(key)
+        n_query = len(query_grams)
+        # Short names change a large share of their n-grams per typo, so filter on
+        # a looser Dice bound and apply min_score to the final blended score.
+        gram_cutoff = min_score * 0.8
+        # Dice = 2c / (|A| + |B|) >= s together with c <= |B| gives c >= s|A| / (2 - s),
+        # which prunes most entries that only share a common gram or two.
+        min_shared = max(1, math.ceil(gram_cutoff * n_query / (2 - gram_cutoff)))
+        shared_counts = Counter()
+        for gram in query_grams:
+            shared_counts.update(self._postings.get(gram, ()))
+        sizes = self._sizes
+        scored = []
+        for entry_id in [e for e, c in shared_counts.items() if c >= min_shared]:
+            dice = 2 * shared_counts[entry_id] / (n_query + sizes[entry_id])
+            if dice >= gram_cutoff:
+                scored.append((dice, entry_id))
+        # Re-rank the short list with an edit-based ratio so ordering reflects typos
+        # rather than only shared n-gram counts.
+        results = []
+        for dice, entry_id in heapq.nlargest(k * 3, scored):
+            ratio = difflib.SequenceMatcher(None, key, self._jamo[entry_id], autojunk=False).ratio()
+            score = (dice + ratio) / 2
+            if score >= min_score:
+                results.append((score, self._names[entry_id]))
+        results.sort(reverse=True)
+        return results[:k]
+
+    def __len__(self):
+        return len(self._names)
+
+@st.cache_resource(show_spinner=False)
+def get_name_registry(event_id):
+    # Built once per process and round; name_registry() keeps it current afterwards.
+    with db_connection() as conn:
+        # Read before the names: a commit in between only causes a redundant refresh.
+        registry = CompanyNameRegistry(get_names_version(conn, event_id))
+        list_rows = conn.execute("""
+            SELECT list_name, normalized_name, company_name FROM company_lists
+            WHERE event_id = ?
+            ORDER BY list_name = ?, list_name, id
+        """, (event_id, SOURCE_VC)).fetchall()
+        rows = conn.execute("SELECT id, raw_searched_name, company_name FROM recommended_companies WHERE event_id = ? ORDER BY id", (event_id,)).fetchall()
+    for list_name, normalized_name, company_name in list_rows:
+        registry.add(normalized_name, list_name, company_name)
+    registry.add_recommendations(rows)
+    return registry
+
+def get_names_version(conn, event_id):
+    result = conn.execute("SELECT names_version FROM event_stats WHERE event_id = ?", (event_id,)).fetchone()
+    return result[0] if result else 0
+
+@read_cached
+def get_name_registry_changes(event_id, after_id):
+    """(names_version, recommendations after ``after_id``) for one round; cached until the next commit."""
+    with db_connection() as conn:
+        names_version = get_names_version(conn, event_id)
+        rows = conn.execute(
+            "SELECT id, raw_searched_name, company_name FROM recommended_companies WHERE id > ? AND event_id = ? ORDER BY id",
+            (after_id, event_id),
+        ).fetchall()
+    return names_version, rows
+
+def name_registry(event_id):
+    """The round's registry, up to date with commits from this or any other process.
+
+    Between commits this is a read-cache hit. New recommendations are added
+    incrementally; any other change to the round's names rebuilds the registry.
+    """
+    registry = get_name_registry(event_id)
+    names_version, rows = get_name_registry_changes(event_id, registry.last_recommendation_id)
+    if names_version != registry.names_version:
+        get_name_registry.clear()
+        return get_name_registry(event_id)
+    registry.add_recommendations(rows)
+    return registry
+
+# --- Streamlit UI 구성 ---
+APP_CSS = """
+    <style>
+        .stApp {
+            background-color: #FFFFFF; /* Changed to white */
+        }
+        .main .block-container {
+            padding-top: 2rem;
+            padding-bottom: 2rem;
+            padding-left: 3rem;
+            padding-right: 3rem;
+        }
+        .stButton>button {
+            border-radius: 8px;
+        }
+        /* Input fields styling for better visibility and focus effect */
+        .stTextInput input, .stTextArea textarea, .stSelectbox select {
+            border-radius: 8px;
+            border: 1px solid #cccccc; /* Default border for distinction */
+            padding: 0.5em 0.75em; /* Added padding for better text appearance */
+            background-color: #FFFFFF; /* Ensure input background is white */
+            transition: border-color 0.2s ease-in-out, box-shadow 0.2s ease-in-out; /* Smooth transition */
+        }
+        .stTextInput input:focus, .stTextArea textarea:focus, .stSelectbox select:focus {
+            border-color: #4A90E2; /* Blue border on focus */
+            box-shadow: 0 0 0 0.2rem rgba(74, 144, 226, 0.25); /* Subtle blue glow on focus */
+            outline: none; /* Remove default browser outline if custom styling is applied */
+        }
+        h1 {
+            font-size: 2.2em; font-weight: 600; color: #1A202C;
+        }
+        h2 { /* 섹션 제목 - st.header 사용 */
+            font-size: 1.6em; font-weight: 600; color: #2D3748;
+            border-bottom: 2px solid #E2E8F0; padding-bottom: 0.3em;
+            margin-top: 2em; margin-bottom: 1em;
+        }
+        .stAlert { border-radius: 8px; }
+        .list-item {
+            padding: 0.5rem 0;
+            border-bottom: 1px solid #e9ecef;
+        }
+        .list-item:last-child { border-bottom: none; }
+        .company-name { font-weight: 600; color: #333; }
+        .company-detail { font-size: 0.9em; color: #555; }
+        .vc-list-item { /* VC 제공 리스트 아이템 전용 스타일 */
+            padding: 0.4rem 0.8rem;
+            margin-bottom: 0.3rem;
+            background-color: #F8F9FA; /* Slightly off-white for VC items if needed, or #FFFFFF */
+            border-left: 3px solid #4A90E2; /* 파란색 강조선 */
+            border-radius: 4px;
+        }
+        .vc-grid { /* VC 리스트를 한 번에 그리는 3열 그리드 */
+            display: grid;
+            grid-template-columns: repeat(3, minmax(0, 1fr));
+            column-gap: 1rem;
+        }
+        .info-block { /* 긴 안내문구를 위한 스타일 */
+            padding: 1.5rem;
+            background-color: #F8F9FA; /* Kept slightly off-white for this block, or change to #FFFFFF */
+            border: 1px solid #E2E8F0; /* Add a subtle border if background is also white */
+            border-radius: 8px;
+            line-height: 1.7;
+            font-size: 0.95em;
+        }
+        .info-block strong {
+            color: #0072C6;
+        }
+    </style>
+"""
 
-    intro_text = """
+INTRO_TEXT = """
 보건복지부, 중앙사회서비스원, 그리고 엠와이소셜컴퍼니(MYSC)가 함께 하는 2025 사회서비스 투자 교류회는 사회서비스 분야의 혁신 기업들이 투자 유치 기회를 확대하고, 투자자 및 유관기관과의 긴밀한 네트워킹을 통해 실질적인 성장을 도모할 수 있도록 마련된 연결의 장입니다.
 다양한 사회서비스 기업을 발굴하고 임팩트 투자 연계를 통해 기업의 스케일업을 지원하며, 궁극적으로 국민 모두에게 고품질의 사회서비스가 제공될 수 있는 건강한 생태계 조성을 목표로 합니다.
 <br><br>
@@ -189,163 +1671,403 @@ def main():
 ■ 상세 정보: <a href="https://invmeeting.streamlit.app/">링크</a><br>
 ■ 문의: mwbyun@mysc.co.kr.
 """
-    # st.container(border=True)를 사용하여 카드 형태로 표시
-    # Note: If info-block background is white, container border=True might make it look better.
-    # If info-block is off-white, the border from info-block itself might be enough.
-    with st.container(border=True): # You can set border=False if info-block has its own distinct background/border
-        st.markdown(f"<div class='info-block'>{intro_text}</div>", unsafe_allow_html=True)
 
-    st.caption(f"현재까지 {current_visit_count - 19}건의 방문이 있었어요. ") # Assuming 19 is a baseline
-    st.divider()
+def vc_pool_html(names):
+    # One markdown element for the whole grid instead of one per company.
+    items = "".join(f'<div class="vc-list-item"><span class="company-name">{html.escape(name)}</span></div>' for name in names)
+    return f'<div class="vc-grid">{items}</div>'
 
-    # Session state initialization (already present, good)
-    if 'show_new_form' not in st.session_state: st.session_state.show_new_form = False
-    if 'searched_company_for_form' not in st.session_state: st.session_state.searched_company_for_form = ""
+def recommendation_list_html(rows):
+    items = []
+    for rec_id, rec_created_at, rec_company_name, rec_social_sector, rec_contact_person, rec_reason in rows:
+        rec_date = datetime.datetime.fromtimestamp(rec_created_at, datetime.timezone.utc).strftime("%Y-%m-%d")
+        rec_reason = rec_reason or ""
+        rec_reason = rec_reason[:REASON_PREVIEW_LENGTH] + '...' if len(rec_reason) > REASON_PREVIEW_LENGTH else rec_reason
+        # Escaped because all rows now share one HTML block: a stray tag in one
+        # submission would otherwise swallow the rest of the list.
+        items.append(f"""
+            <div class="list-item">
+                <div><span class="company-name">{html.escape(rec_company_name or "")}</span> <span style="font-size:0.9em; color:#777;">({html.escape(rec_social_sector or "")})</span></div>
+                <div class="company-detail">추천일: {rec_date} | 추천인(담당): {html.escape(rec_contact_person or "")}</div>
+                <div class="company-detail" style="margin-top:0.2rem;"><em>사유: {html.escape(rec_reason)}</em></div>
+            </div>
+        """)
+    return "".join(items)
 
-    # --- 섹션 1: 기업 검색 ---
+def run_company_search(searched_company_name_input):
+    """Classify a search and return the (level, message) lines to show."""
+    if not searched_company_name_input:
+        st.session_state.show_new_form = False
+        return [("error", "기업명을 입력한 후 검색해주세요.")]
+    st.session_state.searched_company_for_form = searched_company_name_input
+    normalized_search_term = normalize_company_name(searched_company_name_input)
+    registry = name_registry(active_event_id())
+    with timed_block("search.lookup"):
+        match = registry.lookup(normalized_search_term)
+    found_source, original_found_name = match if match else (None, "")
+    count_event(f"search.{'new' if match is None else 'found'}")
+
+    if is_participant_list(found_source):
+        st.session_state.show_new_form = False
+        return [("warning", f"'{original_found_name}' 기업은 {found_source}년 참여 기업입니다. 아쉽지만 본 사업 참여는 어렵습니다. 추천 감사합니다! 😊")]
+    if found_source == SOURCE_VC:
+        st.session_state.show_new_form = False
+        return [("info", f"'{searched_company_name_input}' 기업은 이미 '{original_found_name}' (으)로 운영진 Pooling 목록에 있습니다. 확인 감사합니다! 👍")]
+    if found_source == SOURCE_RECOMMENDED:
+        st.session_state.show_new_form = False
+        return [("info", f"'{searched_company_name_input}' 기업은 이미 '{original_found_name}' (으)로 추천 목록에 있습니다. 확인 감사합니다! 👍")]
+
+    st.session_state.show_new_form = True
+    messages = [("success", f"'{searched_company_name_input}' 기업을 새로 추천할 수 있습니다. 아래 정보를 입력해주세요. 👇")]
+    with timed_block("search.similar"):
+        similar_names = registry.similar(searched_company_name_input)
+    if similar_names:
+        lines = "\n".join(f"- **{name}** ({source_label(source)}, 유사도 {score:.0%})" for score, source, name in similar_names)
+        messages.append(("warning", f"혹시 아래 기업을 찾으시나요? 같은 기업이라면 추천을 생략해주세요. 🙏\n\n{lines}"))
+    return messages
+
+# Each section below is a fragment: interacting with a widget inside one reruns
+# only that function, not the CSS, intro and the other sections.
+@st.fragment
+@timed("ui.search_section")
+def search_section():
     st.header("1. 추천할 기업을 검색해주세요")
     with st.container(border=True):
         searched_company_name_input = st.text_input("기업명", placeholder="예: 제미나이 (띄어쓰기, (주) 제외)", key="search_company_input", label_visibility="collapsed")
         if st.button("🔍 기업 검색", key="search_button", type="primary", use_container_width=True):
-            if searched_company_name_input:
-                st.session_state.searched_company_for_form = searched_company_name_input
-                normalized_search_term = normalize_company_name(searched_company_name_input)
-                found_2023 = any(normalize_company_name(c) == normalized_search_term for c in COMPANIES_2023)
-                original_found_name_2023 = next((c for c in COMPANIES_2023 if normalize_company_name(c) == normalized_search_term), "") if found_2023 else ""
-                found_2024 = any(normalize_company_name(c) == normalized_search_term for c in COMPANIES_2024)
-                original_found_name_2024 = next((c for c in COMPANIES_2024 if normalize_company_name(c) == normalized_search_term), "") if found_2024 else ""
-
-                if found_2023:
-                    st.warning(f"'{original_found_name_2023}' 기업은 2023년 참여 기업입니다. 아쉽지만 본 사업 참여는 어렵습니다. 추천 감사합니다! 😊")
-                    st.session_state.show_new_form = False
-                elif found_2024:
-                    st.warning(f"'{original_found_name_2024}' 기업은 2024년 참여 기업입니다. 아쉽지만 본 사업 참여는 어렵습니다. 추천 감사합니다! 😊")
-                    st.session_state.show_new_form = False
-                else:
-                    conn = sqlite3.connect(DB_NAME)
-                    cursor = conn.cursor()
-                    # Check against raw_searched_name for already recommended
-                    cursor.execute("SELECT company_name FROM recommended_companies WHERE raw_searched_name = ?", (normalized_search_term,))
-                    existing_recommendation = cursor.fetchone()
-                    conn.close()
-                    if existing_recommendation:
-                        st.info(f"'{searched_company_name_input}' 기업은 이미 '{existing_recommendation[0]}' (으)로 추천 목록에 있습니다. 확인 감사합니다! 👍")
-                        st.session_state.show_new_form = False
-                    else:
-                        st.success(f"'{searched_company_name_input}' 기업을 새로 추천할 수 있습니다. 아래 정보를 입력해주세요. 👇")
-                        st.session_state.show_new_form = True
-            else:
-                st.error("기업명을 입력한 후 검색해주세요.")
-                st.session_state.show_new_form = False
+            form_was_shown = st.session_state.show_new_form
+            st.session_state.search_messages = run_company_search(searched_company_name_input)
+            if form_was_shown or st.session_state.show_new_form:
+                # The form lives in another fragment and depends on this result.
+                st.rerun(scope="app")
+        for level, message in st.session_state.search_messages:
+            getattr(st, level)(message)
     st.write("") # Spacer
 
-    # --- 섹션 2: 신규 기업 추천 등록 폼 ---
-    if st.session_state.show_new_form:
-        st.header("2. 추천 기업 정보 입력")
-        with st.container(border=True):
-            with st.form("new_company_form", clear_on_submit=False): # clear_on_submit=False is good for showing errors
-                st.markdown("##### 아래 정보를 입력해주세요. (`*` 필수 항목)")
-                company_name = st.text_input("기업명*", value=st.session_state.searched_company_for_form)
-                col1, col2 = st.columns(2)
-                with col1:
-                    contact_person = st.text_input("담당자 이름*")
-                    contact_phone = st.text_input("담당자 연락처*", placeholder="예: 010-1234-5678")
-                with col2:
-                    contact_email = st.text_input("담당자 이메일*")
-                    investment_stage = st.selectbox("투자 희망 단계", [""] + ["Seed", "Pre-A", "Series A", "Series B", "Series C 이상"])
-
-                social_service_sector_options = [""] + ["복지", "보건의료", "고용", "교육", "주거", "문화", "환경", "기타"]
-                social_service_sector = st.selectbox("사회서비스 분야*", social_service_sector_options)
-                other_sector_detail = ""
-                if social_service_sector == "기타":
-                    other_sector_detail = st.text_input("기타 사회서비스 분야 (구체적으로 명시)*")
-
-                introduction_material_url = st.text_input("기업 소개 자료 URL (선택)")
-                reason_for_recommendation = st.text_area("추천 사유*", height=120, placeholder="이 기업을 추천하는 이유를 알려주세요.")
-                submitted = st.form_submit_button("✅ 추천 완료하기", type="primary", use_container_width=True)
-
-                if submitted:
-                    final_social_sector = other_sector_detail if social_service_sector == "기타" else social_service_sector
-                    error_messages = []
-                    if not company_name.strip(): error_messages.append("기업명을 입력해주세요.")
-                    if not contact_person.strip(): error_messages.append("담당자 이름을 입력해주세요.")
-                    if not contact_email.strip(): error_messages.append("담당자 이메일을 입력해주세요.") # Basic email validation could be added
-                    if not contact_phone.strip(): error_messages.append("담당자 연락처를 입력해주세요.") # Basic phone validation could be added
-                    if not social_service_sector: error_messages.append("사회서비스 분야를 선택해주세요.")
-                    if social_service_sector == "기타" and not other_sector_detail.strip(): error_messages.append("기타 사회서비스 분야를 구체적으로 입력해주세요.")
-                    if not reason_for_recommendation.strip(): error_messages.append("추천 사유를 입력해주세요.")
-
-                    if error_messages:
-                        for msg in error_messages: st.error(msg)
-                    else: # is_valid
-                        recommendation_data = {
-                            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "company_name": company_name.strip(),
-                            "contact_person": contact_person.strip(),
-                            "contact_email": contact_email.strip(),
-                            "contact_phone": contact_phone.strip(),
-                            "social_sector": final_social_sector.strip(),
-                            "investment_stage": investment_stage,
-                            "intro_url": introduction_material_url.strip(),
-                            "recommendation_reason": reason_for_recommendation.strip(),
-                            "raw_searched_name": normalize_company_name(company_name) # Use normalized original input for dupe check
-                        }
-                        if add_recommendation(recommendation_data):
-                            st.success(f"'{company_name.strip()}' 기업 추천이 완료되었습니다. 소중한 정보 감사합니다! ✨")
-                            st.balloons()
-                            st.session_state.show_new_form = False
-                            st.session_state.searched_company_for_form = "" # Clear the searched name
-                            # To clear form fields, you might need to reset widget keys or use st.rerun()
-                            # For st.form, a rerun is often the cleanest way to "reset" after successful submission if clear_on_submit=False
-                            st.rerun()
-                        else:
-                            st.error(f"'{company_name.strip()}' 기업은 이미 추천되었거나 저장 중 문제가 발생했습니다.")
-    st.divider()
+@st.fragment
+@timed("ui.recommendation_form_section")
+def recommendation_form_section():
+    if not st.session_state.show_new_form:
+        return
+    st.header("2. 추천 기업 정보 입력")
+    with st.container(border=True):
+        with st.form("new_company_form", clear_on_submit=False): # clear_on_submit=False is good for showing errors
+            st.markdown("##### 아래 정보를 입력해주세요. (`*` 필수 항목)")
+            company_name = st.text_input("기업명*", value=st.session_state.searched_company_for_form)
+            col1, col2 = st.columns(2)
+            with col1:
+                contact_person = st.text_input("담당자 이름*")
+                contact_phone = st.text_input("담당자 연락처*", placeholder="예: 010-1234-5678")
+            with col2:
+                contact_email = st.text_input("담당자 이메일*")
+                investment_stage = st.selectbox("투자 희망 단계", [""] + ["Seed", "Pre-A", "Series A", "Series B", "Series C 이상"])
 
-    # --- 섹션 3: VC 제공 주요 검토 리스트 ---
+            social_service_sector_options = [""] + ["복지", "보건의료", "고용", "교육", "주거", "문화", "환경", "기타"]
+            social_service_sector = st.selectbox("사회서비스 분야*", social_service_sector_options)
+            other_sector_detail = ""
+            if social_service_sector == "기타":
+                other_sector_detail = st.text_input("기타 사회서비스 분야 (구체적으로 명시)*")
+
+            introduction_material_url = st.text_input("기업 소개 자료 URL (선택)")
+            reason_for_recommendation = st.text_area("추천 사유*", height=120, placeholder="이 기업을 추천하는 이유를 알려주세요.")
+            submitted = st.form_submit_button("✅ 추천 완료하기", type="primary", use_container_width=True)
+
+            if submitted:
+                final_social_sector = other_sector_detail if social_service_sector == "기타" else social_service_sector
+                error_messages = []
+                if not company_name.strip(): error_messages.append("기업명을 입력해주세요.")
+                if not contact_person.strip(): error_messages.append("담당자 이름을 입력해주세요.")
+                if not contact_email.strip(): error_messages.append("담당자 이메일을 입력해주세요.") # Basic email validation could be added
+                if not contact_phone.strip(): error_messages.append("담당자 연락처를 입력해주세요.") # Basic phone validation could be added
+                if not social_service_sector: error_messages.append("사회서비스 분야를 선택해주세요.")
+                if social_service_sector == "기타" and not other_sector_detail.strip(): error_messages.append("기타 사회서비스 분야를 구체적으로 입력해주세요.")
+                if not reason_for_recommendation.strip(): error_messages.append("추천 사유를 입력해주세요.")
+
+                if error_messages:
+                    for msg in error_messages: st.error(msg)
+                else: # is_valid
+                    recommendation_data = {
+                        "event_id": active_event_id(),
+                        "timestamp": datetime.datetime.now().strftime(TIMESTAMP_FORMAT),
+                        "company_name": company_name.strip(),
+                        "contact_person": contact_person.strip(),
+                        "contact_email": contact_email.strip(),
+                        "contact_phone": contact_phone.strip(),
+                        "social_sector": final_social_sector.strip(),
+                        "investment_stage": investment_stage,
+                        "intro_url": introduction_material_url.strip(),
+                        "recommendation_reason": reason_for_recommendation.strip(),
+                        "raw_searched_name": normalize_company_name(company_name) # Use normalized original input for dupe check
+                    }
+                    if add_recommendation(recommendation_data):
+                        st.success(f"'{company_name.strip()}' 기업 추천이 완료되었습니다. 소중한 정보 감사합니다! ✨")
+                        st.balloons()
+                        st.session_state.show_new_form = False
+                        st.session_state.searched_company_for_form = "" # Clear the searched name
+                        st.session_state.search_messages = []
+                        # Full-app rerun: hides the form and refreshes the member list in its own fragment.
+                        st.rerun(scope="app")
+                    else:
+                        st.error(f"'{company_name.strip()}' 기업은 이미 추천되었거나 저장 중 문제가 발생했습니다.")
+
+@timed("ui.vc_pool_section")
+def vc_pool_section():
+    # No widgets here, so it only renders on full-app reruns.
     st.header("🌟 지금까지 추천/Pooling된 기업입니다!")
     with st.container(border=True):
-        if VC_PROVIDED_NAMES:
+        vc_names = get_company_list(active_event_id(), SOURCE_VC)
+        if vc_names:
             st.markdown("아래 기업들은 운영진에 의해서 Pooling된 기업들입니다. 참고 부탁드려용!")
-            cols = st.columns(3)
-            for i, company_name in enumerate(VC_PROVIDED_NAMES):
-                with cols[i % 3]:
-                    st.markdown(f"""
-                        <div class="vc-list-item">
-                            <span class="company-name">{company_name}</span>
-                        </div>
-                    """, unsafe_allow_html=True)
-            # Fill empty columns if the number of items is not a multiple of 3
-            if len(VC_PROVIDED_NAMES) % 3 != 0:
-                for _ in range(3 - (len(VC_PROVIDED_NAMES) % 3)):
-                     with cols[(len(VC_PROVIDED_NAMES) % 3) + _]:
-                        st.markdown("&nbsp;", unsafe_allow_html=True) # Non-breaking space for layout
+            st.markdown(vc_pool_html(vc_names), unsafe_allow_html=True)
         else:
             st.info("현재 VC 제공 주요 검토 대상 기업 리스트가 없습니다.")
     st.write("") # Spacer
 
-    # --- 섹션 4: 구성원 추천 기업 현황 ---
+def _load_more_recommendations():
+    st.session_state.rec_pages += 1
+
+@st.fragment
+@timed("ui.member_recommendations_section")
+def member_recommendations_section():
     st.header("👥 구성원 추천 기업 현황")
     with st.container(border=True):
-        all_recs = get_all_recommendations()
-        if all_recs:
-            st.caption(f"총 {len(all_recs)}개 기업이 추천되었습니다. (최근 10개 표시)")
-            for rec in all_recs[:10]:
-                rec_timestamp = rec[1]
-                rec_company_name = rec[2]
-                rec_social_sector = rec[6]
-                rec_contact_person = rec[3]
-                rec_reason = rec[9]
-
-                st.markdown(f"""
-                    <div class="list-item">
-                        <div><span class="company-name">{rec_company_name}</span> <span style="font-size:0.9em; color:#777;">({rec_social_sector})</span></div>
-                        <div class="company-detail">추천일: {rec_timestamp.split()[0]} | 추천인(담당): {rec_contact_person}</div>
-                        <div class="company-detail" style="margin-top:0.2rem;"><em>사유: {rec_reason[:70] + '...' if len(rec_reason) > 70 else rec_reason}</em></div>
-                    </div>
-                """, unsafe_allow_html=True)
+        event_id = active_event_id()
+        if st.session_state.get("rec_page_event") != event_id: # A new round starts from its first page
+            st.session_state.rec_page_event = event_id
+            st.session_state.rec_pages = 1
+        total_recs = count_recommendations(event_id)
+        if total_recs:
+            # Only the page count is kept in the session: cursors saved on an earlier
+            # run go stale once a newer row is inserted, and the rows pushed across a
+            # page boundary would drop out of the list.
+            page_rows, next_cursor = get_recommendations_page(event_id, limit=st.session_state.rec_pages * RECOMMENDATIONS_PAGE_SIZE)
+            st.caption(f"총 {total_recs}개 기업이 추천되었습니다. (최근 {len(page_rows)}개 표시)")
+            st.markdown(recommendation_list_html(page_rows), unsafe_allow_html=True)
+            if next_cursor is not None:
+                st.button("더 보기", key="load_more_recommendations", use_container_width=True, on_click=_load_more_recommendations)
         else:
             st.info("아직 추천된 기업이 없습니다. 첫 번째 추천을 통해 목록을 채워주세요! 🚀")
 
+def admin_sidebar():
+    if not ADMIN_PASSWORD:
+        return False
+    with st.sidebar:
+        if st.session_state.get("admin_unlocked"):
+            st.success("운영자 메뉴가 열렸습니다.")
+            return True
+        password = st.text_input("운영자 비밀번호", type="password", key="admin_password_input")
+        # Compared as bytes: compare_digest rejects non-ASCII str (e.g. Hangul typed by an IME).
+        if password and hmac.compare_digest(password.encode("utf-8"), ADMIN_PASSWORD.encode("utf-8")):
+            st.session_state.admin_unlocked = True
+            st.rerun()
+        elif password:
+            st.error("비밀번호가 올바르지 않습니다.")
+    return False
+
+@st.fragment
+def admin_data_section():
+    st.header("🔒 운영자 메뉴")
+    event_id, event_name = get_active_event()
+    with st.container(border=True):
+        st.markdown(f"##### 추천 기업 내보내기 ({event_name})")
+        cols = st.columns(len(EXPORT_FORMATS))
+        for col, (fmt, mime) in zip(cols, EXPORT_FORMATS.items()):
+            with col:
+                st.download_button(
+                    f"⬇️ {fmt.upper()}",
+                    data=functools.partial(export_recommendations_file, event_id, fmt), # Generated only when clicked
+                    file_name=f"recommended_companies_event{event_id}_{datetime.date.today():%Y%m%d}.{fmt}",
+                    mime=mime,
+                    key=f"export_{fmt}",
+                    disabled=fmt == "xlsx" and openpyxl is None,
+                    use_container_width=True,
+                    on_click="ignore",
+                )
+
+        st.markdown("##### 참여기업 / Pooling 리스트 가져오기")
+        st.caption("첫 번째 열에 기업명이 있는 CSV/TXT/XLSX 또는 company_name 필드가 있는 JSONL 파일. 같은 리스트의 기존 기업명은 교체됩니다.")
+        existing = get_company_list_names(event_id)
+        list_name = st.text_input("리스트 이름 (참여 연도 예: 2025, 또는 vc)", key="import_list_name")
+        st.caption("현재 리스트: " + ", ".join(f"{name} ({len(get_company_list(event_id, name))}개)" for name in existing))
+        uploaded = st.file_uploader("파일 선택", type=["csv", "txt", "xlsx", "jsonl"], key="import_list_file")
+        if st.button("📥 가져오기", key="import_list_button", disabled=uploaded is None):
+            if not re.fullmatch(r"\d{4}|" + SOURCE_VC, list_name.strip()):
+                st.error("리스트 이름은 네 자리 연도 또는 vc 여야 합니다.")
+            else:
+                try:
+                    started = time.perf_counter()
+                    count = import_company_list(event_id, list_name.strip(), iter_company_names(uploaded.name, uploaded))
+                    st.success(f"'{list_name.strip()}' 리스트에 {count}개 기업을 불러왔습니다. ({(time.perf_counter() - started) * 1000:.0f} ms)")
+                except IMPORT_FILE_ERRORS as exc:
+                    st.error(f"가져오기에 실패했습니다: {exc}")
+
+@st.fragment
+def admin_events_section():
+    st.subheader("🗓️ 교류회 회차")
+    events = list_events()
+    with st.container(border=True):
+        st.dataframe(
+            [{"ID": event_id, "회차": name, "진행 중": bool(is_active), "추천": recommendations, "방문": visits, "보관 파일": archived_to or ""}
+             for event_id, name, is_active, recommendations, visits, archived_to in events],
+            hide_index=True, use_container_width=True,
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            name = st.text_input("새 회차 이름", placeholder="예: 2025년 2회 사회서비스 투자 교류회", key="new_event_name")
+            if st.button("🆕 새 회차 시작", key="start_event_button", disabled=not name.strip(), use_container_width=True):
+                start_event(name.strip())
+                st.rerun() # Every section reads the active round
+            st.caption("현재 회차의 참여기업 / Pooling 리스트가 새 회차로 복사됩니다.")
+        with col2:
+            archivable = {event_id: name for event_id, name, is_active, recommendations, visits, archived_to in events if not is_active and not archived_to}
+            event_id = st.selectbox("보관할 회차", list(archivable), format_func=lambda v: f"{v}. {archivable[v]}", key="archive_event_id")
+            if st.button("📦 보관 파일로 이동", key="archive_event_button", disabled=event_id is None, use_container_width=True):
+                try:
+                    moved = archive_event(event_id)
+                    st.success(f"{moved}건을 {ARCHIVE_DB_NAME} 로 옮겼습니다.")
+                except (ValueError, sqlite3.Error) as exc:
+                    st.error(f"보관에 실패했습니다: {exc}")
+
+def component_stats():
+    return {
+        "pool": get_connection_pool(DB_NAME).stats(),
+        "read_cache": get_read_cache(DB_NAME).stats(),
+        "writer": get_recommendation_writer(DB_NAME).stats(),
+        "visits": {"pending": get_visit_counter(DB_NAME).pending(), "flushes": get_visit_counter(DB_NAME).flushes},
+    }
+
+def write_prometheus_metrics(path=METRICS_FILE):
+    text = get_metrics().prometheus_text(component_stats())
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path) # Scrapers never see a half-written file
+    return path
+
+def _reset_search_page():
+    st.session_state.admin_search_page = 0
+
+def _move_search_page(step):
+    st.session_state.admin_search_page += step
+
+@st.fragment
+def admin_search_section():
+    st.subheader("🔎 추천 기업 검색")
+    with st.container(border=True):
+        if 'admin_search_page' not in st.session_state: st.session_state.admin_search_page = 0
+        query = st.text_input("검색어 (기업명·추천 사유)", placeholder="예: 돌봄 AI", key="admin_search_query", on_change=_reset_search_page)
+        # Options come from all rows so they stay put while typing; the per-query
+        # counts go in a caption below instead of into the option labels.
+        event_id = active_event_id()
+        _, _, all_sectors, all_stages = search_recommendations(event_id)
+        col1, col2 = st.columns(2)
+        with col1:
+            sector = st.selectbox("사회서비스 분야", [None] + sorted(value for value, n in all_sectors),
+                                  format_func=lambda v: "전체" if v is None else v or "(미입력)",
+                                  key="admin_search_sector", on_change=_reset_search_page)
+        with col2:
+            stage = st.selectbox("투자 희망 단계", ["*"] + sorted(value for value, n in all_stages),
+                                 format_func=lambda v: "전체" if v == "*" else v or "(미입력)",
+                                 key="admin_search_stage", on_change=_reset_search_page)
+        page = st.session_state.admin_search_page
+        rows, total, sector_counts, stage_counts = search_recommendations(event_id, query.strip(), sector, None if stage == "*" else stage, page)
+        st.caption("분야: " + " · ".join(f"{v or '(미입력)'} {n}" for v, n in sector_counts)
+                   + " | 단계: " + " · ".join(f"{v or '(미입력)'} {n}" for v, n in stage_counts))
+        if any(len(term) < BIGRAM_TERM_LENGTH for term in query.split()):
+            st.caption("1글자 검색어는 색인 없이 비교하므로 결과가 많을 때 느릴 수 있습니다.")
+        st.caption(f"{total}건 중 {page * SEARCH_PAGE_SIZE + 1 if rows else 0}–{page * SEARCH_PAGE_SIZE + len(rows)}건")
+        if rows:
+            st.markdown("".join(f"""
+                <div class="list-item">
+                    <div><span class="company-name">{html.escape(company_name or "")}</span> <span style="font-size:0.9em; color:#777;">({html.escape(social_sector or "")} · {html.escape(investment_stage or "-")})</span></div>
+                    <div class="company-detail">추천일: {datetime.datetime.fromtimestamp(created_at, datetime.timezone.utc):%Y-%m-%d} | 추천인(담당): {html.escape(contact_person or "")}</div>
+                    <div class="company-detail" style="margin-top:0.2rem;"><em>{highlight_snippet(snippet)}</em></div>
+                </div>
+            """ for rec_id, created_at, company_name, social_sector, investment_stage, contact_person, snippet in rows), unsafe_allow_html=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.button("◀ 이전", key="admin_search_prev", disabled=page == 0, use_container_width=True, on_click=_move_search_page, args=(-1,))
+        with col2:
+            st.button("다음 ▶", key="admin_search_next", disabled=(page + 1) * SEARCH_PAGE_SIZE >= total, use_container_width=True, on_click=_move_search_page, args=(1,))
+
+@st.fragment
+def admin_metrics_section():
+    st.subheader("📈 성능 지표")
+    with st.container(border=True):
+        if not METRICS_ENABLED:
+            st.info("APP_METRICS=0 으로 계측이 꺼져 있습니다.")
+        rows, counters = get_metrics().summary()
+        if rows:
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+        if counters:
+            st.caption(" · ".join(f"{name}: {value}" for name, value in sorted(counters.items())))
+        for component, stats in component_stats().items():
+            st.caption(f"**{component}** " + " · ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in stats.items()))
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("💾 Prometheus 파일로 저장", key="write_metrics_file", use_container_width=True):
+                try:
+                    st.success(f"{write_prometheus_metrics()} 에 저장했습니다.")
+                except OSError as exc:
+                    st.error(f"저장에 실패했습니다: {exc}")
+        with col2:
+            st.button("🔄 새로고침", key="refresh_metrics", use_container_width=True)
+
+@timed("ui.main")
+def main():
+    st.set_page_config(page_title="사회서비스 투자교류회 기업업 추천", page_icon="🌱", layout="wide")
+
+    # Custom CSS
+    with timed_block("ui.css"):
+        st.markdown(APP_CSS, unsafe_allow_html=True)
+
+    ensure_schema(DB_NAME) # DB 초기화 (프로세스당 1회)
+
+    # 방문자 수 트래킹
+    if 'visited_this_session' not in st.session_state:
+        increment_visit_count()
+        st.session_state.visited_this_session = True
+    current_visit_count = get_visit_count(active_event_id()) + get_visit_counter(DB_NAME).pending()
+
+    # --- 페이지 제목 ---
+    with timed_block("ui.intro"):
+        st.title("🌱 사회서비스 투자기업 추천")
+
+        # st.container(border=True)를 사용하여 카드 형태로 표시
+        # Note: If info-block background is white, container border=True might make it look better.
+        # If info-block is off-white, the border from info-block itself might be enough.
+        with st.container(border=True): # You can set border=False if info-block has its own distinct background/border
+            st.markdown(f"<div class='info-block'>{INTRO_TEXT}</div>", unsafe_allow_html=True)
+
+        st.caption(f"현재까지 {current_visit_count}건의 방문이 있었어요. ")
+        st.divider()
+
+    # Session state initialization (already present, good)
+    if 'show_new_form' not in st.session_state: st.session_state.show_new_form = False
+    if 'searched_company_for_form' not in st.session_state: st.session_state.searched_company_for_form = ""
+    if 'search_messages' not in st.session_state: st.session_state.search_messages = []
+    if 'rec_pages' not in st.session_state: st.session_state.rec_pages = 1
+
+    # --- 섹션 1: 기업 검색 ---
+    search_section()
+
+    # --- 섹션 2: 신규 기업 추천 등록 폼 ---
+    recommendation_form_section()
+    st.divider()
+
+    # --- 섹션 3: VC 제공 주요 검토 리스트 ---
+    vc_pool_section()
+
+    # --- 섹션 4: 구성원 추천 기업 현황 ---
+    member_recommendations_section()
+
+    # --- 운영자 메뉴 (ADMIN_PASSWORD 설정 시) ---
+    if admin_sidebar():
+        st.divider()
+        admin_data_section()
+        admin_events_section()
+        admin_search_section()
+        admin_metrics_section()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
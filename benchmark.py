@@ -0,0 +1,390 @@
+"""Load test and micro-benchmarks for app.py.
+
+Runs the app headless with Streamlit's AppTest against a temporary copy of the
+DB, so the real social_service_recommendations.db is never touched:
+
+    python benchmark.py --sessions 40 --concurrency 4 --output bench_results.json
+
+AppTest runs one script at a time per process, so the load test above uses
+worker processes and measures full-render latency. A second, threaded phase
+(--threads) calls the functions a script run uses from many threads inside one
+process, so its connection pool, write queue and read cache see concurrent
+traffic.
+
+Results are written as JSON (with the current git commit) so runs can be diffed
+across commits.
+"""
+import argparse
+import concurrent.futures
+import datetime
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+SOURCE_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "social_service_recommendations.db")
+DEFAULT_TABLE_SIZES = [1_000, 10_000, 100_000]
+
+
+def percentiles(samples):
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": rank(50) * 1000,
+        "p95_ms": rank(95) * 1000,
+        "p99_ms": rank(99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=os.path.dirname(APP_PATH)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# --- Simulated sessions ---
+class SessionRecorder:
+    def __init__(self):
+        self._lock = threading.Lock() # Shared by all sessions in threaded mode
+        self.latencies = {}
+        self.errors = []
+
+    def record(self, interaction, seconds):
+        with self._lock:
+            self.latencies.setdefault(interaction, []).append(seconds)
+
+    def error(self, interaction, message):
+        with self._lock:
+            self.errors.append({"interaction": interaction, "message": message})
+
+
+def _timed_run(recorder, interaction, action):
+    started = time.perf_counter()
+    at = action()
+    recorder.record(interaction, time.perf_counter() - started)
+    if at.exception:
+        recorder.error(interaction, at.exception[0].message)
+    return at
+
+
+def _widget(widgets, label):
+    return next(widget for widget in widgets if widget.label == label)
+
+
+def run_session(session_id, recorder, known_names, args, rng):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+    at = _timed_run(recorder, "landing", at.run)
+    for search_no in range(args.searches):
+        if rng.random() < args.hit_ratio:
+            interaction, name = "search_hit", rng.choice(known_names)
+        else:
+            interaction, name = "search_new", f"벤치기업{session_id}-{search_no}-{rng.randrange(10**6)}"
+        at.text_input(key="search_company_input").input(name)
+        at = _timed_run(recorder, interaction, at.button(key="search_button").click().run)
+        if interaction == "search_new" and rng.random() < args.submit_ratio and at.session_state["show_new_form"]:
+            _widget(at.text_input, "담당자 이름*").input(f"담당자{session_id}")
+            _widget(at.text_input, "담당자 연락처*").input("010-0000-0000")
+            _widget(at.text_input, "담당자 이메일*").input(f"bench{session_id}@example.com")
+            _widget(at.selectbox, "사회서비스 분야*").select("복지")
+            _widget(at.text_area, "추천 사유*").input("벤치마크 제출")
+            at = _timed_run(recorder, "submit", _widget(at.button, "✅ 추천 완료하기").click().run)
+
+
+def app_namespace(args):
+    # Streamlit executes the script in a fresh module installed as __main__; its
+    # functions share st.cache_resource entries (pool, caches, writer) with the
+    # sessions run in this process, unlike a plain `import app`.
+    from streamlit.testing.v1 import AppTest
+
+    AppTest.from_file(APP_PATH, default_timeout=args.timeout).run()
+    return sys.modules["__main__"]
+
+
+def run_worker(worker_id, session_ids, args):
+    # AppTest drives one script run at a time per process (it owns a global
+    # Runtime), so concurrency comes from worker processes sharing the DB file,
+    # the same way several server processes would.
+    import app # Only for the participant lists; all traffic goes through AppTest
+
+    known_names = app.COMPANIES_2023 + app.COMPANIES_2024
+    recorder = SessionRecorder()
+    for session_id in session_ids:
+        try:
+            run_session(session_id, recorder, known_names, args, random.Random(args.seed * 1_000_003 + session_id))
+        except Exception as exc: # Keep going; a failed session is reported, not fatal
+            recorder.error("session", repr(exc))
+    ns = app_namespace(args)
+    return {
+        "latencies": recorder.latencies,
+        "errors": recorder.errors,
+        "pool": ns.get_connection_pool(ns.DB_NAME).stats(),
+        "writer": ns.get_recommendation_writer(ns.DB_NAME).stats(),
+        "read_cache": ns.get_read_cache(ns.DB_NAME).stats(),
+    }
+
+
+def load_test(args):
+    import multiprocessing
+
+    assignments = [list(range(worker, args.sessions, args.concurrency)) for worker in range(args.concurrency)]
+    started = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.concurrency, mp_context=multiprocessing.get_context("spawn")) as pool:
+        workers = list(pool.map(run_worker, range(args.concurrency), assignments, [args] * args.concurrency))
+    wall = time.perf_counter() - started
+    return {"sessions": args.sessions, "concurrency": args.concurrency, **summarize_load(workers, wall)}
+
+
+def summarize_load(workers, wall):
+    latencies = {}
+    errors = []
+    for worker in workers:
+        for name, samples in worker["latencies"].items():
+            latencies.setdefault(name, []).extend(samples)
+        errors.extend(worker["errors"])
+    def total(section, field):
+        return sum(worker[section][field] for worker in workers)
+    interactions = sum(len(samples) for samples in latencies.values())
+    lock_errors = [e for e in errors if "locked" in e["message"] or "busy" in e["message"]]
+    return {
+        "wall_seconds": wall,
+        "throughput_interactions_per_s": interactions / wall if wall else 0.0,
+        "latency": {name: percentiles(samples) for name, samples in sorted(latencies.items())},
+        "pool_waits": { # Script threads queued for one of the process's pooled connections
+            "waits": total("pool", "waits"),
+            "wait_total_ms": total("pool", "wait_total_ms"),
+            "wait_max_ms": max(worker["pool"]["wait_max_ms"] for worker in workers),
+        },
+        "db_lock_waits": { # Time inside busy_timeout waiting for sqlite's write lock (BEGIN IMMEDIATE)
+            "lock_waits": total("pool", "lock_waits"),
+            "lock_wait_total_ms": total("pool", "lock_wait_total_ms"),
+            "lock_wait_max_ms": max(worker["pool"]["lock_wait_max_ms"] for worker in workers),
+            "writer_commit_max_ms": max(worker["writer"]["commit_max_ms"] for worker in workers),
+            "locked_errors": len(lock_errors),
+            "failed_write_batches": total("writer", "failed_batches"),
+        },
+        "writer": { # Rows per batch above 1 means concurrent submits were group-committed
+            "batches": total("writer", "batches"),
+            "rows": total("writer", "rows"),
+            "conflicts": total("writer", "conflicts"),
+            "avg_batch_size": (total("writer", "rows") + total("writer", "conflicts")) / total("writer", "batches") if total("writer", "batches") else 0.0,
+            "max_queue_depth": max(worker["writer"]["max_queue_depth"] for worker in workers),
+        },
+        "read_cache": {
+            "hits": total("read_cache", "hits"),
+            "misses": total("read_cache", "misses"),
+            "invalidations": total("read_cache", "invalidations"),
+        },
+        "errors": errors[:20],
+        "error_count": len(errors),
+    }
+
+
+# --- In-process threaded load ---
+def _timed_call(recorder, interaction, action):
+    started = time.perf_counter()
+    try:
+        return action()
+    except Exception as exc: # Reported like a script exception; the session goes on
+        recorder.error(interaction, repr(exc))
+        return None
+    finally:
+        recorder.record(interaction, time.perf_counter() - started)
+
+
+def run_thread_session(app, session_id, recorder, known_names, args, rng):
+    # The same traffic as run_session, minus rendering: the list reads a page
+    # load makes, searches, and submits for some of the new names.
+    event_id = app.active_event_id()
+    _timed_call(recorder, "landing", lambda: (app.count_recommendations(event_id), app.get_recommendations_page(event_id)))
+    for search_no in range(args.searches):
+        if rng.random() < args.hit_ratio:
+            interaction, name = "search_hit", rng.choice(known_names)
+        else:
+            interaction, name = "search_new", f"벤치기업T{session_id}-{search_no}-{rng.randrange(10**6)}"
+        messages = _timed_call(recorder, interaction, lambda: app.run_company_search(name))
+        if interaction == "search_new" and messages and messages[0][0] == "success" and rng.random() < args.submit_ratio:
+            data = {
+                "event_id": event_id,
+                "timestamp": datetime.datetime.now().strftime(app.TIMESTAMP_FORMAT),
+                "company_name": name,
+                "contact_person": f"담당자{session_id}",
+                "contact_email": f"bench{session_id}@example.com",
+                "contact_phone": "010-0000-0000",
+                "social_sector": "복지",
+                "investment_stage": "Seed",
+                "intro_url": "",
+                "recommendation_reason": "벤치마크 제출",
+                "raw_searched_name": app.normalize_company_name(name),
+            }
+            if _timed_call(recorder, "submit", lambda: app.add_recommendation(data)) is False:
+                recorder.error("submit", "not stored")
+    _timed_call(recorder, "load_more", lambda: app.get_recommendations_page(event_id, limit=2 * app.RECOMMENDATIONS_PAGE_SIZE))
+
+
+def threaded_load_test(args):
+    import app # Bare mode: st.cache_resource and st.session_state are process-wide here
+
+    app.ensure_schema(app.DB_NAME)
+    # Warm the process the way a running server already is, so the first
+    # sessions don't measure the registry build or the writer thread start.
+    app.name_registry(app.active_event_id())
+    app.get_recommendation_writer(app.DB_NAME)
+
+    known_names = app.COMPANIES_2023 + app.COMPANIES_2024
+    recorder = SessionRecorder()
+
+    def session(session_id):
+        try:
+            run_thread_session(app, session_id, recorder, known_names, args, random.Random(args.seed * 1_000_003 + session_id))
+        except Exception as exc:
+            recorder.error("session", repr(exc))
+
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(session, range(args.sessions)))
+    wall = time.perf_counter() - started
+    worker = {
+        "latencies": recorder.latencies,
+        "errors": recorder.errors,
+        "pool": app.get_connection_pool(app.DB_NAME).stats(),
+        "writer": app.get_recommendation_writer(app.DB_NAME).stats(),
+        "read_cache": app.get_read_cache(app.DB_NAME).stats(),
+    }
+    return {"sessions": args.sessions, "threads": args.threads, "pool_size": worker["pool"]["size"], **summarize_load([worker], wall)}
+
+
+# --- Micro-benchmarks ---
+def _per_call(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1000
+
+
+def synthetic_names(app, count, seed):
+    # Names stitched from syllables of the real participant lists, so n-gram
+    # overlap between names looks like production rather than "기업1", "기업2", ...
+    rng = random.Random(seed)
+    syllables = sorted(set("".join(app.COMPANIES_2023 + app.COMPANIES_2024 + app.VC_PROVIDED_NAMES)))
+    names = {}
+    while len(names) < count:
+        name = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 6)))
+        names.setdefault(app.normalize_company_name(name), name)
+    return list(names.values())
+
+
+def fill_synthetic_table(app, db_path, names):
+    app.DB_NAME = db_path
+    app.ensure_schema(db_path)
+    base = datetime.datetime(2025, 1, 1)
+    with app.db_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("""
+            INSERT INTO recommended_companies
+            (event_id, timestamp, created_at, company_name, contact_person, contact_email, contact_phone, social_sector, investment_stage, intro_url, recommendation_reason, raw_searched_name)
+            VALUES ((SELECT id FROM events WHERE is_active = 1), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            (ts.strftime(app.TIMESTAMP_FORMAT), app.timestamp_to_epoch(ts.strftime(app.TIMESTAMP_FORMAT)), name, "담당자", "a@example.com", "010-0000-0000", "복지", "Seed", "", "합성 추천 사유 " * 10, app.normalize_company_name(name))
+            for name, ts in ((name, base + datetime.timedelta(seconds=i)) for i, name in enumerate(names))
+        ))
+        conn.commit()
+
+
+def micro_benchmarks(args, workdir):
+    import app
+
+    results = {
+        "normalize_company_name_us": _per_call(lambda: app.normalize_company_name("(주) 에이치투 케이"), 20_000) * 1000,
+    }
+    for size in args.sizes:
+        db_path = os.path.join(workdir, f"synthetic_{size}.db")
+        names = synthetic_names(app, size, args.seed)
+        fill_synthetic_table(app, db_path, names)
+        cache = app.get_read_cache(db_path)
+        event_id = app.active_event_id()
+        app.get_name_registry.clear() # Next call rebuilds from this DB
+        build_started = time.perf_counter()
+        registry = app.get_name_registry(event_id)
+        build_ms = (time.perf_counter() - build_started) * 1000
+        probe = names[size // 2]
+        typo = probe[:-1] + ("가" if probe[-1] != "가" else "나")
+
+        def cold(func, *func_args):
+            cache.invalidate()
+            return func(*func_args)
+
+        results[f"rows_{size}"] = {
+            "registry_build_ms": build_ms,
+            "search_exact_ms": _per_call(lambda: registry.lookup(app.normalize_company_name(probe)), 2_000),
+            "search_similar_ms": _per_call(lambda: registry.similar(typo), 200),
+            "get_all_recommendations_cold_ms": _per_call(lambda: cold(app.get_all_recommendations, event_id), 3 if size >= 100_000 else 10),
+            "get_all_recommendations_cached_ms": _per_call(lambda: app.get_all_recommendations(event_id), 1_000),
+            "get_recommendations_page_cold_ms": _per_call(lambda: cold(app.get_recommendations_page, event_id, None, app.RECOMMENDATIONS_PAGE_SIZE), 200),
+            "count_recommendations_cold_ms": _per_call(lambda: cold(app.count_recommendations, event_id), 200),
+            "search_recommendations_cold_ms": _per_call(lambda: cold(app.search_recommendations, event_id, "합성 추천"), 20),
+            # Paging through one query: facet counts stay cached, only the page is read.
+            "search_recommendations_next_page_ms": _per_call(lambda pages=itertools.count(1): app.search_recommendations(event_id, "합성 추천", page=next(pages)), 20),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=40, help="simulated user sessions")
+    parser.add_argument("--concurrency", type=int, default=4, help="worker processes running sessions at the same time")
+    parser.add_argument("--threads", type=int, default=16, help="concurrent sessions in the in-process threaded phase (0 to skip)")
+    parser.add_argument("--searches", type=int, default=3, help="searches per session")
+    parser.add_argument("--hit-ratio", type=float, default=0.5, help="share of searches for 2023/2024 participants")
+    parser.add_argument("--submit-ratio", type=float, default=0.5, help="share of new-name searches that submit the form")
+    parser.add_argument("--sizes", type=int, nargs="*", default=DEFAULT_TABLE_SIZES, help="synthetic table sizes for micro-benchmarks")
+    parser.add_argument("--timeout", type=float, default=60, help="AppTest timeout per interaction (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skip-load", action="store_true", help="only run micro-benchmarks")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="app-bench-")
+    db_path = os.path.join(workdir, "social_service_recommendations.db")
+    shutil.copy(SOURCE_DB, db_path)
+    # Must be set before app.py is first executed: DB_NAME is read at import time.
+    os.environ["SOCIAL_SERVICE_DB"] = db_path
+    os.environ.pop("ADMIN_PASSWORD", None)
+    try:
+        results = {
+            "commit": git_commit(),
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "args": vars(args),
+        }
+        if not args.skip_load:
+            results["load"] = load_test(args)
+            if args.threads:
+                results["threaded_load"] = threaded_load_test(args)
+        results["micro"] = micro_benchmarks(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(json.dumps({k: v for k, v in results.items() if k in ("load", "threaded_load", "micro")}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()